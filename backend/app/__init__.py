@@ -2,35 +2,114 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
-import datetime
+import logging
 
 # Importar extensões do novo arquivo
 from app.extensions import db, jwt
+from app.services import db_routing
+from app.utils import compression
+from app.utils.json_provider import FastJSONProvider
+from app.utils.log_setup import configure_logging, default_level, parse_levels
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
-def create_app():
+logger = logging.getLogger(__name__)
+
+def create_app(bootstrap=None, cli=True):
+    """
+    Cria a aplicação. Com bootstrap=False (modo serve, usado por wsgi.py) não
+    há nenhum acesso ao banco; as tabelas e os dados iniciais vêm de
+    'flask bootstrap'. Com bootstrap=None vale BOOTSTRAP_ON_START.
+    cli=False não registra os comandos 'flask ...' (nem importa app.commands):
+    os workers da API não precisam deles.
+    """
     app = Flask(__name__)
     
+    # Respostas JSON: orjson se instalado ('auto'), ou 'json' para a biblioteca padrão
+    app.config['JSON_BACKEND'] = os.getenv('JSON_BACKEND', 'auto').lower()
+    app.json = FastJSONProvider(app)
+    app.json.configure(app.config['JSON_BACKEND'])
+    
     # Configurações
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev_secret_key')
     
+    # Logs: nível padrão por ambiente, LOG_LEVEL para trocar e LOG_LEVELS por logger
+    app.config['ENVIRONMENT'] = os.getenv('APP_ENV') or os.getenv('FLASK_ENV', 'production')
+    app.config['LOG_LEVEL'] = os.getenv('LOG_LEVEL', default_level(app.config['ENVIRONMENT'])).upper()
+    app.config['LOG_LEVELS'] = parse_levels(os.getenv('LOG_LEVELS'))
+    configure_logging(app)
+    
+    # Preparar o banco (tabelas, categorias, admin) ao iniciar: só em desenvolvimento
+    # por padrão; em produção, rode 'flask bootstrap' uma vez por implantação
+    app.config['BOOTSTRAP_ON_START'] = os.getenv(
+        'BOOTSTRAP_ON_START', 'true' if app.config['ENVIRONMENT'] == 'development' else 'false'
+    ).lower() in ('1', 'true', 'yes')
+    
     # Configuração do banco de dados MySQL
     db_user = os.getenv('DB_USER')
     db_password = os.getenv('DB_PASSWORD')
     db_host = os.getenv('DB_HOST')
     db_name = os.getenv('DB_NAME')
     
-    # Construir a URI do banco de dados MySQL
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{db_user}:{db_password}@{db_host}/{db_name}"
+    # Construir a URI do banco de dados MySQL (DATABASE_URL substitui, ex.: SQLite local)
+    database_url = os.getenv('DATABASE_URL') or f"mysql+pymysql://{db_user}:{db_password}@{db_host}/{db_name}"
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    
+    # Pool de conexões (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    # DB_POOL_RECYCLE, DB_POOL_PRE_PING), aplicado ao primário e às réplicas
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = db_routing.engine_options(database_url, os.environ)
+    
+    # Réplicas de leitura (URLs separadas por vírgula) e por quantos segundos as
+    # leituras de um usuário ficam no primário depois de ele gravar algo
+    app.config['SQLALCHEMY_BINDS'] = db_routing.replica_binds(
+        db_routing.parse_replica_urls(os.getenv('DATABASE_REPLICA_URLS')))
+    app.config['DB_READ_PIN_SECONDS'] = float(os.getenv('DB_READ_PIN_SECONDS', '5'))
+    app.config['DB_READ_PIN_BACKEND'] = os.getenv('DB_READ_PIN_BACKEND', 'memory')
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'dev_jwt_secret_key')
     
+    # Segundos até o registro de categorias recarregar (0 = só quando alterado neste worker)
+    app.config['CATEGORY_REGISTRY_TTL'] = int(os.getenv('CATEGORY_REGISTRY_TTL', '0'))
+    
+    # Segundos que o usuário autenticado fica em cache entre requisições (0 = desligado)
+    app.config['USER_CACHE_TTL'] = float(os.getenv('USER_CACHE_TTL', '0'))
+    
+    # Hash de senhas: parâmetros no formato do werkzeug e pool de processos
+    # (PASSWORD_HASH_WORKERS=0 faz o hash na própria thread da requisição)
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    app.config['PASSWORD_HASH_SALT_LENGTH'] = int(os.getenv('PASSWORD_HASH_SALT_LENGTH', '16'))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+    app.config['PASSWORD_HASH_MAX_QUEUE'] = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', '64'))
+    app.config['PASSWORD_HASH_TIMEOUT'] = int(os.getenv('PASSWORD_HASH_TIMEOUT', '10'))
+    
+    # Ranking: 'memory' (por worker) ou 'redis' (compartilhado entre workers)
+    app.config['LEADERBOARD_BACKEND'] = os.getenv('LEADERBOARD_BACKEND', 'memory')
+    # Com o backend 'memory', cada worker ressincroniza a sua cópia a cada
+    # LEADERBOARD_REBUILD_INTERVAL segundos (0 = nunca; só com um único worker)
+    app.config['LEADERBOARD_REBUILD_INTERVAL'] = int(os.getenv('LEADERBOARD_REBUILD_INTERVAL', '60'))
+    app.config['WEB_CONCURRENCY'] = int(os.getenv('WEB_CONCURRENCY', '1'))
+    app.config['REDIS_URL'] = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Métricas por endpoint em /metrics, com o token METRICS_TOKEN. Sem token, só
+    # com METRICS_ALLOW_LOCAL=true e a partir de localhost (não use atrás de um
+    # proxy reverso local: para a aplicação, toda requisição viria de localhost)
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    app.config['METRICS_ALLOW_LOCAL'] = os.getenv('METRICS_ALLOW_LOCAL', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Compressão das respostas (gzip; brotli se o pacote estiver instalado)
+    # a partir de COMPRESS_MIN_SIZE bytes
+    app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', '6'))
+    app.config['COMPRESS_BROTLI_QUALITY'] = int(os.getenv('COMPRESS_BROTLI_QUALITY', '4'))
+    
     # Inicializar extensões
     db.init_app(app)
     jwt.init_app(app)
-    CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True,
+         expose_headers=['X-Next-Cursor', 'ETag', 'Last-Modified'])
     
     # Adicione manipuladores de erro JWT
     @jwt.invalid_token_loader
@@ -54,69 +133,68 @@ def create_app():
             'error': error_string
         }), 401
 
+    # Fila de hash de senhas cheia: pedir para o cliente tentar novamente
+    from app.services.passwords import HashingBusy
+
+    @app.errorhandler(HashingBusy)
+    def hashing_busy_callback(error):
+        return jsonify({
+            'message': 'Servidor ocupado. Tente novamente em instantes.',
+            'error': 'hashing_busy'
+        }), 503, {'Retry-After': '1'}
+
     # Importação para garantir que os modelos sejam registrados
     with app.app_context():
         # Importar modelos aqui para evitar importação circular
         from app.models.user import User
         from app.models.transaction import Transaction, TransactionCategory
+        from app.models.summary import MonthlySummary
+        from app.services.categories import category_registry
+        from app.services import data_version  # registra o versionamento dos dados do usuário
+        from app.services import leaderboard, metrics, passwords
+        from app.services.user_cache import user_cache
+        
+        category_registry.ttl = app.config['CATEGORY_REGISTRY_TTL']
+        user_cache.ttl = app.config['USER_CACHE_TTL']
+        leaderboard.configure(app)
+        passwords.configure(app)
+        db_routing.configure(app)
+        metrics.init_app(app)
+        compression.init_app(app)
         
         # Registrar blueprints
         from app.api.routes import api as api_blueprint
         from app.api.transaction_routes import transaction_api as transaction_api_blueprint
         from app.api.xp_routes import xp_api as xp_api_blueprint
+        from app.api.dashboard_routes import dashboard_api as dashboard_api_blueprint
         
         app.register_blueprint(api_blueprint, url_prefix='/api')
         app.register_blueprint(transaction_api_blueprint, url_prefix='/api')
         app.register_blueprint(xp_api_blueprint, url_prefix='/api')
+        app.register_blueprint(dashboard_api_blueprint, url_prefix='/api')
+        
+        if app.config['METRICS_ENABLED']:
+            from app.api.metrics_routes import metrics_api as metrics_api_blueprint
+            app.register_blueprint(metrics_api_blueprint)
 
-        try:
-            # Criar tabelas se não existirem
-            db.create_all()
-            print("Tabelas criadas com sucesso!")
-            
-            default_categories = [
-                {'name': 'Salário', 'type': 'income', 'description': 'Rendimentos do trabalho', 'icon': 'money-bill', 'color': '#4CAF50'},
-                {'name': 'Investimentos', 'type': 'income', 'description': 'Rendimentos de investimentos', 'icon': 'chart-line', 'color': '#2196F3'},
-                {'name': 'Presentes', 'type': 'income', 'description': 'Dinheiro recebido como presente', 'icon': 'gift', 'color': '#9C27B0'},
-                {'name': 'Outros (Receita)', 'type': 'income', 'description': 'Outras fontes de receita', 'icon': 'plus-circle', 'color': '#607D8B'},
-                
-                {'name': 'Alimentação', 'type': 'expense', 'description': 'Mercado, restaurantes e delivery', 'icon': 'utensils', 'color': '#F44336'},
-                {'name': 'Moradia', 'type': 'expense', 'description': 'Aluguel, contas e manutenção', 'icon': 'home', 'color': '#FF9800'},
-                {'name': 'Transporte', 'type': 'expense', 'description': 'Combustível, passagens e manutenção', 'icon': 'car', 'color': '#795548'},
-                {'name': 'Lazer', 'type': 'expense', 'description': 'Entretenimento e hobbies', 'icon': 'gamepad', 'color': '#E91E63'},
-                {'name': 'Saúde', 'type': 'expense', 'description': 'Medicamentos, consultas e planos', 'icon': 'heartbeat', 'color': '#00BCD4'},
-                {'name': 'Educação', 'type': 'expense', 'description': 'Cursos, livros e materiais', 'icon': 'graduation-cap', 'color': '#3F51B5'},
-                {'name': 'Compras', 'type': 'expense', 'description': 'Roupas, eletrônicos e outros', 'icon': 'shopping-bag', 'color': '#9E9E9E'},
-                {'name': 'Assinaturas', 'type': 'expense', 'description': 'Serviços recorrentes', 'icon': 'calendar-check', 'color': '#8BC34A'},
-                {'name': 'Outros (Despesa)', 'type': 'expense', 'description': 'Gastos diversos', 'icon': 'minus-circle', 'color': '#607D8B'}
-            ]
-
-            for category_data in default_categories:
-                existing = TransactionCategory.query.filter_by(name=category_data['name']).first()
-                if not existing:
-                    category = TransactionCategory(**category_data)
-                    db.session.add(category)
-            
-            db.session.commit()
-            print("Categorias padrão criadas!")
+        # Registrar comandos de linha de comando (FLASK_APP=run.py)
+        if cli:
+            from app.commands import bootstrap_command, leaderboard_cli, money_cli, rollups_cli, seed_data, xp_cli
+            app.cli.add_command(bootstrap_command)
+            app.cli.add_command(rollups_cli)
+            app.cli.add_command(leaderboard_cli)
+            app.cli.add_command(xp_cli)
+            app.cli.add_command(money_cli)
+            app.cli.add_command(seed_data)
 
-            # Criar um usuário administrador se não existir
-            admin_username = os.getenv('ADMIN_USERNAME', 'admin')
-            admin_password = os.getenv('ADMIN_PASSWORD', 'admin123')
-            
-            if not User.query.filter_by(username=admin_username).first():
-                admin_user = User(
-                    username=admin_username,
-                    email=os.getenv('ADMIN_EMAIL', 'admin@example.com'),
-                    phone=os.getenv('ADMIN_PHONE', '(00) 00000-0000'),
-                    full_name='Administrador do Sistema',
-                    birth_date=datetime.datetime.strptime('2000-01-01', '%Y-%m-%d').date()
-                )
-                admin_user.set_password(admin_password)
-                db.session.add(admin_user)
-                db.session.commit()
-                print(f"Usuário administrador criado: {admin_username}")
-        except Exception as e:
-            print(f"Erro ao configurar banco de dados: {str(e)}")
+        # Modo serve: nenhuma consulta ao banco durante a criação da aplicação
+        if bootstrap is None:
+            bootstrap = app.config['BOOTSTRAP_ON_START']
+        if bootstrap:
+            from app.services.bootstrap import bootstrap_database
+            try:
+                bootstrap_database()
+            except Exception as e:
+                logger.exception("Erro ao configurar banco de dados: %s", e)
     
     return app
\ No newline at end of file
@@ -0,0 +1,84 @@
+from flask import Blueprint, request, jsonify, make_response
+from flask_jwt_extended import jwt_required
+from app.models.transaction import Transaction
+from app.services import aggregation, pagination
+from app.services.categories import category_registry
+from app.utils.auth import get_current_user
+from app.utils.http_cache import is_not_modified
+import hashlib
+
+dashboard_api = Blueprint('dashboard_api', __name__)
+
+# Seções do dashboard e a versão de que cada uma depende
+SECTIONS = ('profile', 'categories', 'summary', 'recent_transactions')
+
+
+def section_etags(user):
+    user_version = f'u{user.id}.{user.data_version}'
+    # O resumo é do mês corrente: muda na virada do mês mesmo sem escritas
+    month = aggregation.period_start('month').strftime('%Y-%m')
+    return {
+        'profile': f'profile-{user_version}',
+        'categories': f'categories-c{category_registry.version}',
+        'summary': f'summary-{month}-{user_version}',
+        'recent_transactions': f'recent-5-{user_version}'
+    }
+
+
+def parse_known(value):
+    """Lê 'secao:etag,secao:etag' enviado pelo cliente com as versões que ele já tem."""
+    known = {}
+    for item in (value or '').split(','):
+        section, _, etag = item.partition(':')
+        if section in SECTIONS and etag:
+            known[section] = etag
+    return known
+
+
+def build_section(section, user):
+    if section == 'profile':
+        return user.to_dict()
+    if section == 'categories':
+        return [category.to_dict() for category in category_registry.all()]
+    if section == 'summary':
+        return {'period': 'month', **aggregation.summarize_period(user.id, 'month')}
+
+    query = aggregation.apply_filters(Transaction.query, user.id, {})
+    transactions, _ = pagination.fetch_page(query, 5)
+    return [transaction.to_dict() for transaction in transactions]
+
+
+# Dados do dashboard em uma única requisição: perfil, categorias, resumo do mês
+# e as 5 transações mais recentes
+@dashboard_api.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    user = get_current_user()
+
+    if not user:
+        return jsonify({'error': 'Usuário não encontrado'}), 404
+
+    etags = section_etags(user)
+
+    # ETag da resposta inteira: muda se qualquer seção mudar
+    combined = hashlib.sha1('|'.join(etags[s] for s in SECTIONS).encode()).hexdigest()[:20]
+    if is_not_modified(combined, None):
+        response = make_response('', 304)
+        response.set_etag(combined, weak=True)
+        return response
+
+    # Seções que o cliente já tem na versão atual voltam como null
+    known = parse_known(request.args.get('known'))
+    not_modified = [s for s in SECTIONS if known.get(s) == etags[s]]
+
+    payload = {
+        section: None if section in not_modified else build_section(section, user)
+        for section in SECTIONS
+    }
+    payload['etags'] = etags
+    payload['not_modified'] = not_modified
+
+    response = make_response(jsonify(payload), 200)
+    response.set_etag(combined, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
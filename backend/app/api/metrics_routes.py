@@ -0,0 +1,27 @@
+from flask import Blueprint, Response, current_app, jsonify, request
+from app.services import metrics
+import hmac
+
+metrics_api = Blueprint('metrics_api', __name__)
+
+# Endereços que podem coletar sem token com METRICS_ALLOW_LOCAL (o Prometheus
+# rodando na mesma máquina)
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+
+def is_authorized():
+    # Com token configurado, ele é sempre exigido, venha a requisição de onde vier
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        expected = f'Bearer {token}'
+        return hmac.compare_digest(request.headers.get('Authorization', ''), expected)
+    return current_app.config.get('METRICS_ALLOW_LOCAL', False) and request.remote_addr in LOCAL_ADDRESSES
+
+
+# Endpoint interno para o Prometheus (fora de /api: não é exposto ao frontend)
+@metrics_api.route('/metrics', methods=['GET'])
+def get_metrics():
+    if not is_authorized():
+        return jsonify({'error': 'Acesso não autorizado'}), 403
+
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -2,13 +2,14 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from app.models.user import User
 from app.extensions import db  # Importar db do arquivo extensions
+from app.utils.auth import get_current_user
+from app.utils.http_cache import conditional
 import datetime
 import logging
 
 api = Blueprint('api', __name__)
 
 # Configurar logging no início do arquivo
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Rota de teste
@@ -23,29 +24,29 @@ def test():
 def register():
     try:
         data = request.get_json()
-        logger.debug(f"Dados recebidos no registro: {data}")
+        logger.debug("Registro recebido para o usuário: %s", data.get('username') if data else None)
         
         # Verifica se todos os campos necessários estão presentes
         required_fields = ['username', 'password', 'email', 'phone', 'full_name', 'birth_date']
         for field in required_fields:
             if field not in data:
-                logger.error(f"Campo obrigatório ausente: {field}")
+                logger.error("Campo obrigatório ausente: %s", field)
                 return jsonify({'error': f'Campo {field} é obrigatório'}), 400
         
         # Verificar se usuário ou email já existem
         if User.query.filter_by(username=data['username']).first():
-            logger.warning(f"Tentativa de registro com nome de usuário já existente: {data['username']}")
+            logger.warning("Tentativa de registro com nome de usuário já existente: %s", data['username'])
             return jsonify({'error': 'Nome de usuário já existe'}), 400
         
         if User.query.filter_by(email=data['email']).first():
-            logger.warning(f"Tentativa de registro com email já existente: {data['email']}")
+            logger.warning("Tentativa de registro com email já existente: %s", data['email'])
             return jsonify({'error': 'Email já está em uso'}), 400
         
         # Formatar a data de nascimento
         try:
             birth_date = datetime.datetime.strptime(data['birth_date'], '%Y-%m-%d').date()
         except ValueError as e:
-            logger.error(f"Erro ao converter data de nascimento: {e}")
+            logger.error("Erro ao converter data de nascimento: %s", e)
             return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
         
         # Criar novo usuário
@@ -61,11 +62,11 @@ def register():
         db.session.add(new_user)
         db.session.commit()
         
-        logger.info(f"Usuário registrado com sucesso: {data['username']}")
+        logger.info("Usuário registrado com sucesso: %s", data['username'])
         return jsonify({'message': 'Usuário registrado com sucesso', 'user_id': new_user.id}), 201
     
     except Exception as e:
-        logger.error(f"Erro ao registrar usuário: {str(e)}")
+        logger.error("Erro ao registrar usuário: %s", e)
         db.session.rollback()
         return jsonify({'error': 'Erro interno do servidor. Por favor, tente novamente.'}), 500
 
@@ -86,17 +87,30 @@ def login():
     if not user or not user.check_password(data['password']):
         return jsonify({'error': 'Nome de usuário ou senha inválidos'}), 401
     
+    # Atualizar o hash se os parâmetros configurados mudaram (gravado no mesmo commit)
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+    
     # Verificar e conceder XP por login diário
     xp_gained = False
     daily_xp_amount = 0
     
+    # A verificação em memória evita o UPDATE quando o XP de hoje já foi
+    # concedido; o UPDATE condicional é quem garante uma única concessão
     today = datetime.datetime.utcnow().date()
     if user.last_xp_grant != today:
-        # Conceder XP por login diário (50 XP)
-        xp_gained, xp, level, daily_xp_amount = user.grant_daily_login_xp()
+        grant = user.grant_daily_login_xp()
+        if grant[0]:
+            xp_gained, xp, level, daily_xp_amount = grant
     
-    # Atualizar último login
+    # Atualizar último login e gravar tudo em um único commit
     user.update_last_login()
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error("Erro ao registrar login: %s", e)
+        return jsonify({'error': 'Erro interno do servidor. Por favor, tente novamente.'}), 500
     
     # Criar token JWT - usar ID como string para garantir compatibilidade
     access_token = create_access_token(
@@ -104,7 +118,7 @@ def login():
         expires_delta=datetime.timedelta(days=1)
     )
     
-    print(f"Token gerado para usuário {user.username}, ID: {user.id}")
+    logger.debug("Token gerado para usuário %s, ID: %s", user.username, user.id)
     
     response_data = {
         'message': 'Login bem-sucedido',
@@ -127,25 +141,21 @@ def login():
 # Read (Obter perfil do usuário)
 @api.route('/profile', methods=['GET'])
 @jwt_required()
+@conditional()
 def get_profile():
     try:
         # Obter ID do usuário a partir do token JWT
-        current_user_id = get_jwt_identity()
-        print(f"ID do usuário do token: {current_user_id}")
-        
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         
         if not user:
-            print(f"Usuário não encontrado: {current_user_id}")
+            logger.debug("Usuário não encontrado: %s", get_jwt_identity())
             return jsonify({'error': 'Usuário não encontrado'}), 404
         
-        # Log para debug
-        print(f"Usuário encontrado: {user.username}, ID: {user.id}")
-        
-        # Retornar dados do usuário
-        return jsonify(user.to_dict()), 200
+        # Retornar dados do usuário (com o resumo financeiro se pedido)
+        include_transactions = request.args.get('include_transactions', '').lower() in ('1', 'true')
+        return jsonify(user.to_dict(include_transactions=include_transactions)), 200
     except Exception as e:
-        print(f"Erro ao processar perfil: {str(e)}")
+        logger.error("Erro ao processar perfil: %s", e)
         return jsonify({'error': f'Erro ao processar perfil: {str(e)}'}), 500
 
 # Update (Atualizar perfil do usuário)
@@ -153,8 +163,7 @@ def get_profile():
 @jwt_required()
 def update_profile():
     # Obter ID do usuário a partir do token JWT
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({'error': 'Usuário não encontrado'}), 404
@@ -202,8 +211,7 @@ def update_profile():
 @jwt_required()
 def delete_profile():
     # Obter ID do usuário a partir do token JWT
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({'error': 'Usuário não encontrado'}), 404
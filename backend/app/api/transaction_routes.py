@@ -1,13 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models.transaction import Transaction, TransactionCategory
-from app.models.user import User
+from app.models.transaction import Transaction
 from app.extensions import db  # Importar db do arquivo extensions
+from app.services import aggregation, cashflow, columnar, pagination, rollups
+from app.services.categories import category_registry
+from app.services.db_routing import read_replica
+from app.utils.auth import get_current_user
+from app.utils.compression import precompressed
+from app.utils.http_cache import category_version, conditional, user_data_version_on
 import datetime
 import logging
 
 # Configurar logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 transaction_api = Blueprint('transaction_api', __name__)
@@ -15,50 +19,84 @@ transaction_api = Blueprint('transaction_api', __name__)
 # Obter todas as categorias
 @transaction_api.route('/categories', methods=['GET'])
 @jwt_required()
+@read_replica
+@conditional(category_version)
+@precompressed(category_version)
 def get_categories():
-    categories = TransactionCategory.query.all()
+    categories = category_registry.all()
     return jsonify([category.to_dict() for category in categories]), 200
 
 # Obter todas as transações do usuário
 @transaction_api.route('/transactions', methods=['GET'])
 @jwt_required()
+@read_replica
+@conditional()
 def get_transactions():
     user_id = get_jwt_identity()
     
     # Parâmetros de filtro opcionais
-    type_filter = request.args.get('type')
-    category_id = request.args.get('category_id')
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
+    try:
+        filters = aggregation.parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     limit = request.args.get('limit', 50, type=int)
+    cursor = request.args.get('cursor')
+    response_format = request.args.get('format', 'rows')
+    if response_format not in columnar.FORMATS:
+        return jsonify({'error': f"Formato inválido. Use: {', '.join(columnar.FORMATS)}"}), 400
     
-    query = Transaction.query.filter_by(user_id=user_id)
+    query = aggregation.apply_filters(Transaction.query, user_id, filters)
+    if response_format == 'columnar':
+        query = columnar.query_columns(query)
     
-    # Aplicar filtros se fornecidos
-    if type_filter:
-        query = query.filter_by(type=type_filter)
+    # Ordenar por data (mais recente primeiro, id como desempate) e paginar por cursor
+    try:
+        transactions, next_cursor = pagination.fetch_page(query, limit, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    if category_id:
-        query = query.filter_by(category_id=category_id)
+    # Uma lista por campo e as categorias uma vez só, sempre com o envelope
+    if response_format == 'columnar':
+        return jsonify({**columnar.build(transactions), 'next_cursor': next_cursor}), 200
     
-    if start_date:
-        try:
-            start = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
-            query = query.filter(Transaction.date >= start)
-        except ValueError:
-            return jsonify({'error': 'Formato de data inválido para start_date. Use YYYY-MM-DD'}), 400
+    items = [transaction.to_dict() for transaction in transactions]
     
-    if end_date:
-        try:
-            end = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
-            query = query.filter(Transaction.date <= end)
-        except ValueError:
-            return jsonify({'error': 'Formato de data inválido para end_date. Use YYYY-MM-DD'}), 400
+    # Quem envia 'cursor' (mesmo vazio) recebe o envelope paginado; os demais
+    # continuam recebendo a lista, com o próximo cursor no cabeçalho
+    if cursor is not None:
+        return jsonify({'transactions': items, 'next_cursor': next_cursor}), 200
     
-    # Ordenar por data (mais recente primeiro) e limitar resultados
-    transactions = query.order_by(Transaction.date.desc()).limit(limit).all()
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
+
+# Exportar o histórico de transações (NDJSON ou CSV), em streaming
+@transaction_api.route('/transactions/export', methods=['GET'])
+@jwt_required()
+def export_transactions():
+    user_id = get_jwt_identity()
     
-    return jsonify([transaction.to_dict() for transaction in transactions]), 200
+    # Mesmos filtros de /transactions
+    try:
+        filters = aggregation.parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Importado só aqui: a exportação é rara e não precisa pesar no início do worker
+    from app.services import exporter
+    
+    file_format = request.args.get('format', 'ndjson')
+    if file_format == 'csv':
+        body, mimetype = exporter.generate_csv(user_id, filters), 'text/csv'
+    elif file_format == 'ndjson':
+        body, mimetype = exporter.generate_ndjson(user_id, filters), 'application/x-ndjson'
+    else:
+        return jsonify({'error': 'Formato deve ser "ndjson" ou "csv"'}), 400
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=transacoes.{file_format}'
+    return response
 
 # Criar uma nova transação
 @transaction_api.route('/transactions', methods=['POST'])
@@ -78,7 +116,7 @@ def create_transaction():
         return jsonify({'error': 'Tipo de transação deve ser "income" ou "expense"'}), 400
     
     # Validar categoria
-    category = TransactionCategory.query.get(data['category_id'])
+    category = category_registry.get(data['category_id'])
     if not category:
         return jsonify({'error': 'Categoria não encontrada'}), 404
     
@@ -106,19 +144,77 @@ def create_transaction():
         )
         
         db.session.add(new_transaction)
+        rollups.record(new_transaction)
         db.session.commit()
         
-        logger.info(f"Transação criada: {new_transaction.description} - {new_transaction.amount}")
+        logger.info("Transação criada: %s - %s", new_transaction.description, new_transaction.amount)
         return jsonify({'message': 'Transação criada com sucesso', 'transaction': new_transaction.to_dict()}), 201
         
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Erro ao criar transação: {str(e)}")
+        logger.error("Erro ao criar transação: %s", e)
         return jsonify({'error': 'Erro ao criar transação. Por favor, tente novamente.'}), 500
 
+# Importar transações em lote (CSV ou OFX)
+@transaction_api.route('/transactions/import', methods=['POST'])
+@jwt_required()
+def import_transactions():
+    from app.services import importer
+    
+    user_id = get_jwt_identity()
+    
+    # Aceita multipart (campo 'file', que o Werkzeug guarda em disco quando é
+    # grande) ou o arquivo direto no corpo da requisição
+    upload = request.files.get('file')
+    if upload is not None:
+        stream = upload.stream
+        filename = (upload.filename or '').lower()
+        content_type = upload.mimetype or ''
+    else:
+        stream = request.stream
+        filename = ''
+        content_type = request.mimetype or ''
+    
+    file_format = request.args.get('format')
+    if not file_format:
+        is_ofx = filename.endswith('.ofx') or 'ofx' in content_type
+        file_format = 'ofx' if is_ofx else 'csv'
+    
+    if file_format not in ('csv', 'ofx'):
+        return jsonify({'error': 'Formato deve ser "csv" ou "ofx"'}), 400
+    
+    text = importer.open_text(stream)
+    if file_format == 'ofx':
+        records, convert = importer.iter_ofx(text), importer.ofx_to_row
+    else:
+        records, convert = importer.iter_csv(text), None
+    
+    try:
+        result = importer.import_transactions(user_id, records, convert)
+    except importer.ImportAborted as e:
+        # Lotes anteriores já foram confirmados: informar quantos, para não duplicar
+        logger.error("Importação interrompida: %s", e)
+        return jsonify({
+            'error': 'Importação interrompida. As transações contadas em "imported" já foram gravadas.',
+            **e.result
+        }), 500
+    except Exception as e:
+        db.session.rollback()
+        logger.error("Erro ao importar transações: %s", e)
+        return jsonify({'error': 'Erro ao importar transações. Por favor, tente novamente.'}), 500
+    
+    logger.info("Importação concluída: %s transações, %s erros", result['imported'], result['failed'])
+    
+    if result['imported'] == 0 and (result['failed'] or result['file_error']):
+        return jsonify({'error': 'Nenhuma transação válida no arquivo', **result}), 400
+    
+    message = 'Importação interrompida: arquivo inválido' if result['file_error'] else 'Importação concluída'
+    return jsonify({'message': message, **result}), 201 if result['imported'] else 200
+
 # Obter uma transação específica
 @transaction_api.route('/transactions/<int:transaction_id>', methods=['GET'])
 @jwt_required()
+@conditional()
 def get_transaction(transaction_id):
     user_id = get_jwt_identity()
     transaction = Transaction.query.filter_by(id=transaction_id, user_id=user_id).first()
@@ -140,6 +236,9 @@ def update_transaction(transaction_id):
     
     data = request.get_json()
     
+    # Guardar o estado anterior para ajustar o resumo mensal
+    previous = rollups.snapshot(transaction)
+    
     # Atualizar campos se fornecidos
     if 'description' in data:
         transaction.description = data['description']
@@ -153,7 +252,7 @@ def update_transaction(transaction_id):
         transaction.type = data['type']
     
     if 'category_id' in data:
-        category = TransactionCategory.query.get(data['category_id'])
+        category = category_registry.get(data['category_id'])
         if not category:
             return jsonify({'error': 'Categoria não encontrada'}), 404
         
@@ -170,12 +269,14 @@ def update_transaction(transaction_id):
             return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
     
     try:
+        rollups.unrecord(previous)
+        rollups.record(transaction)
         db.session.commit()
-        logger.info(f"Transação atualizada: {transaction.id}")
+        logger.info("Transação atualizada: %s", transaction.id)
         return jsonify({'message': 'Transação atualizada com sucesso', 'transaction': transaction.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Erro ao atualizar transação: {str(e)}")
+        logger.error("Erro ao atualizar transação: %s", e)
         return jsonify({'error': 'Erro ao atualizar transação. Por favor, tente novamente.'}), 500
 
 # Excluir uma transação
@@ -189,67 +290,115 @@ def delete_transaction(transaction_id):
         return jsonify({'error': 'Transação não encontrada'}), 404
     
     try:
+        previous = rollups.snapshot(transaction)
         db.session.delete(transaction)
+        rollups.unrecord(previous)
         db.session.commit()
-        logger.info(f"Transação excluída: {transaction_id}")
+        logger.info("Transação excluída: %s", transaction_id)
         return jsonify({'message': 'Transação excluída com sucesso'}), 200
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Erro ao excluir transação: {str(e)}")
+        logger.error("Erro ao excluir transação: %s", e)
         return jsonify({'error': 'Erro ao excluir transação. Por favor, tente novamente.'}), 500
 
+def summary_version():
+    # O corpo depende do início do período corrente (mês ou semana de hoje)
+    return user_data_version_on(aggregation.period_start(request.args.get('period', 'all')))
+
+
 # Obter resumo financeiro
 @transaction_api.route('/summary', methods=['GET'])
 @jwt_required()
+@read_replica
+@conditional(summary_version)
 def get_summary():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({'error': 'Usuário não encontrado'}), 404
+    user_id = user.id
     
     # Período do resumo (opcional)
     period = request.args.get('period', 'all')  # 'all', 'month', 'week'
     
-    # Consulta base
-    query = Transaction.query.filter_by(user_id=user_id)
-    
-    # Filtrar por período
-    if period == 'month':
-        first_day = datetime.datetime.utcnow().replace(day=1).date()
-        query = query.filter(Transaction.date >= first_day)
-    elif period == 'week':
-        today = datetime.datetime.utcnow().date()
-        start_of_week = today - datetime.timedelta(days=today.weekday())
-        query = query.filter(Transaction.date >= start_of_week)
-    
-    # Calcular totais
-    transactions = query.all()
-    income = sum(t.amount for t in transactions if t.type == 'income')
-    expenses = sum(t.amount for t in transactions if t.type == 'expense')
-    balance = income - expenses
-    
-    # Calcular por categoria
-    income_by_category = {}
-    expense_by_category = {}
-    
-    for t in transactions:
-        category_name = t.category.name
-        
-        if t.type == 'income':
-            if category_name not in income_by_category:
-                income_by_category[category_name] = 0
-            income_by_category[category_name] += t.amount
-        else:
-            if category_name not in expense_by_category:
-                expense_by_category[category_name] = 0
-            expense_by_category[category_name] += t.amount
+    # Com os mesmos filtros de /transactions, agrupar diretamente as transações
+    # (o período vira o start_date padrão); sem filtros, usar o resumo mensal
+    if aggregation.has_filters(request.args):
+        try:
+            filters = aggregation.parse_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not filters['start_date']:
+            filters['start_date'] = aggregation.period_start(period)
+        summary = aggregation.summarize(user_id, filters)
+    else:
+        summary = aggregation.summarize_period(user_id, period)
+    
+    return jsonify({'period': period, **summary}), 200
+
+
+def cashflow_dates(filters, interval):
+    # Sem end_date a janela termina hoje (UTC) e anda a cada dia
+    end_date = filters['end_date'] or cashflow.today()
+    start_date = filters['start_date'] or cashflow.default_start(end_date, interval)
+    return start_date, end_date
+
+
+def cashflow_version():
+    # O ETag inclui a janela resolvida; parâmetros inválidos ficam para a rota (400)
+    interval = request.args.get('interval', 'month')
+    try:
+        filters = aggregation.parse_filters(request.args)
+    except ValueError:
+        filters = None
+    if interval not in cashflow.INTERVALS or filters is None:
+        return user_data_version_on()
+    return user_data_version_on(*cashflow_dates(filters, interval))
+
+
+# Série de fluxo de caixa para gráficos
+@transaction_api.route('/cashflow', methods=['GET'])
+@jwt_required()
+@read_replica
+@conditional(cashflow_version)
+def get_cashflow():
+    user = get_current_user()
+
+    if not user:
+        return jsonify({'error': 'Usuário não encontrado'}), 404
+
+    interval = request.args.get('interval', 'month')
+    if interval not in cashflow.INTERVALS:
+        return jsonify({'error': f"Intervalo inválido. Use: {', '.join(cashflow.INTERVALS)}"}), 400
+
+    try:
+        filters = aggregation.parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        category_id = int(filters['category_id']) if filters['category_id'] else None
+    except ValueError:
+        return jsonify({'error': 'category_id inválido'}), 400
+
+    if filters['type'] not in (None, 'income', 'expense'):
+        return jsonify({'error': 'Tipo inválido. Use: income, expense'}), 400
     
+    start_date, end_date = cashflow_dates(filters, interval)
+    if start_date > end_date:
+        return jsonify({'error': 'start_date deve ser anterior a end_date'}), 400
+
+    bucket_count = len(cashflow.buckets(start_date, end_date, interval))
+    if bucket_count > cashflow.MAX_BUCKETS:
+        return jsonify({'error': f'Intervalo grande demais: {bucket_count} períodos (máximo {cashflow.MAX_BUCKETS})'}), 400
+
+    by_category = request.args.get('by_category', 'false').lower() in ('true', '1')
+    series = cashflow.series(user.id, interval, start_date, end_date,
+                             by_category=by_category, category_id=category_id,
+                             type_=filters['type'], version=user.data_version)
+
     return jsonify({
-        'period': period,
-        'income': income,
-        'expenses': expenses,
-        'balance': balance,
-        'income_by_category': income_by_category,
-        'expense_by_category': expense_by_category
-    }), 200
\ No newline at end of file
+        'interval': interval,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'series': series
+    }), 200
@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app.models.user import User
 from app.extensions import db  # Importar db do arquivo extensions
-import datetime
+from app.services import leaderboard
+from app.services.db_routing import read_replica
+from app.services.levels import level_for_xp
+from app.utils.auth import get_current_user
+from app.utils.http_cache import conditional
 import logging
 
 # Configurar logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 xp_api = Blueprint('xp_api', __name__)
@@ -14,9 +17,9 @@ xp_api = Blueprint('xp_api', __name__)
 # Obter informações de XP do usuário
 @xp_api.route('/user/xp', methods=['GET'])
 @jwt_required()
+@conditional()
 def get_user_xp():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({'error': 'Usuário não encontrado'}), 404
@@ -25,21 +28,21 @@ def get_user_xp():
         'xp': user.xp,
         'level': user.level,
         'next_level_xp': user.get_next_level_xp(),
-        'last_xp_grant': user.last_xp_grant.strftime('%Y-%m-%d') if user.last_xp_grant else None
+        'last_xp_grant': user.last_xp_grant
     }), 200
 
 # Verificar e conceder XP por login diário
 @xp_api.route('/user/daily-xp', methods=['POST'])
 @jwt_required()
 def grant_daily_xp():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({'error': 'Usuário não encontrado'}), 404
     
     # Tentar conceder XP por login diário
     success, xp, level, *args = user.grant_daily_login_xp()
+    db.session.commit()
     
     if success:
         daily_xp = args[0]
@@ -61,9 +64,9 @@ def grant_daily_xp():
 # Obter histórico de conquistas do usuário (será implementado no futuro)
 @xp_api.route('/user/achievements', methods=['GET'])
 @jwt_required()
+@conditional()
 def get_user_achievements():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({'error': 'Usuário não encontrado'}), 404
@@ -76,7 +79,7 @@ def get_user_achievements():
             'title': 'Primeiro Login',
             'description': 'Você fez seu primeiro login no Pac Poupança!',
             'xp_reward': 50,
-            'achieved_at': user.created_at.strftime('%Y-%m-%d'),
+            'achieved_at': user.created_at.date(),
             'icon': '🏆'
         },
         {
@@ -104,8 +107,7 @@ def get_user_achievements():
 @xp_api.route('/user/recalculate-level', methods=['POST'])
 @jwt_required()
 def recalculate_level():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({'error': 'Usuário não encontrado'}), 404
@@ -114,14 +116,12 @@ def recalculate_level():
     old_level = user.level
     
     # Recalcular o nível com base no XP atual
-    while user.xp >= user.get_next_level_xp():
-        user.level += 1
+    user.level = level_for_xp(user.xp)
     
-    # Verificar se o nível mudou
+    # Verificar se o nível mudou e salvar apenas nesse caso
     level_changed = old_level != user.level
-    
-    # Salvar as alterações
-    db.session.commit()
+    if level_changed:
+        db.session.commit()
     
     return jsonify({
         'message': 'Nível recalculado com sucesso!',
@@ -132,50 +132,70 @@ def recalculate_level():
         'next_level_xp': user.get_next_level_xp()
     }), 200
 
-# Endpoint para obter rankings de usuários (mock por enquanto)
+def ranking_entries(entries, current_user_id):
+    """Completa (user_id, xp, posição) do ranking com nome e nível, em uma consulta."""
+    users = {
+        user.id: user
+        for user in User.query.filter(User.id.in_([user_id for user_id, _, _ in entries])).all()
+    }
+    return [{
+        'username': users[user_id].username,
+        'level': users[user_id].level,
+        'xp': xp,
+        'position': position,
+        'is_current_user': user_id == current_user_id
+    } for user_id, xp, position in entries if user_id in users]
+
+# Endpoint para obter rankings de usuários
 @xp_api.route('/rankings', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_rankings():
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({'error': 'Usuário não encontrado'}), 404
     
-    # Pegar top 5 usuários ordenados por XP
-    top_users = User.query.order_by(User.xp.desc()).limit(5).all()
+    board = leaderboard.get_leaderboard()
     
-    rankings = [{
-        'username': user.username,
-        'level': user.level,
-        'xp': user.xp,
-        'is_current_user': user.id == current_user.id
-    } for user in top_users]
+    # Pegar top 5 usuários ordenados por XP
+    rankings = ranking_entries(board.top(5), current_user.id)
     
     # Adicionar a posição do usuário atual se ele não estiver no top 5
     current_user_in_list = any(r['is_current_user'] for r in rankings)
     
     if not current_user_in_list:
-        # Calcular a posição do usuário atual
-        users_with_more_xp = User.query.filter(User.xp > current_user.xp).count()
-        current_user_position = users_with_more_xp + 1
-        
         rankings.append({
             'username': current_user.username,
             'level': current_user.level,
             'xp': current_user.xp,
-            'position': current_user_position,
+            'position': board.rank(current_user.id),
             'is_current_user': True
         })
     
     return jsonify(rankings), 200
 
+# Usuários imediatamente acima e abaixo do usuário atual no ranking
+@xp_api.route('/rankings/around', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_rankings_around():
+    current_user = get_current_user()
+    
+    if not current_user:
+        return jsonify({'error': 'Usuário não encontrado'}), 404
+    
+    radius = min(max(request.args.get('radius', 2, type=int), 0), 50)
+    entries = leaderboard.get_leaderboard().around(current_user.id, radius)
+    
+    return jsonify(ranking_entries(entries, current_user.id)), 200
+
 # Endpoint para obter desafios disponíveis (mock por enquanto)
 @xp_api.route('/challenges', methods=['GET'])
 @jwt_required()
+@conditional()
 def get_challenges():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({'error': 'Usuário não encontrado'}), 404
@@ -0,0 +1,126 @@
+"""
+Comandos de linha de comando da aplicação (flask <comando>).
+Registrados em create_app().
+"""
+import click
+from flask.cli import AppGroup, with_appcontext
+
+from app.extensions import db
+
+@click.command('bootstrap')
+@with_appcontext
+def bootstrap_command():
+    """Cria as tabelas, as categorias padrão e o usuário administrador (uma vez por implantação)."""
+    from app.services.bootstrap import bootstrap_database
+
+    result = bootstrap_database()
+    click.echo(f"Banco preparado: {result['categories']} categoria(s) criada(s), "
+               f"administrador {'criado: ' + result['admin'] if result['admin'] else 'já existente'}.")
+
+
+rollups_cli = AppGroup('rollups', help='Manutenção do resumo mensal (monthly_summaries).')
+leaderboard_cli = AppGroup('leaderboard', help='Manutenção do ranking de XP.')
+xp_cli = AppGroup('xp', help='Manutenção de XP e níveis.')
+money_cli = AppGroup('money', help='Migração dos valores para centavos.')
+
+
+@rollups_cli.command('rebuild')
+@click.option('--user-id', type=int, default=None, help='Reconstruir apenas um usuário.')
+def rebuild_rollups(user_id):
+    """Recalcula o resumo mensal a partir da tabela de transações."""
+    from app.services import rollup_maintenance
+
+    rows = rollup_maintenance.rebuild(user_id)
+    db.session.commit()
+    click.echo(f"Resumo mensal reconstruído: {rows} linhas.")
+
+
+@rollups_cli.command('verify')
+@click.option('--user-id', type=int, default=None, help='Verificar apenas um usuário.')
+def verify_rollups(user_id):
+    """Compara o resumo mensal com as transações e lista as divergências."""
+    from app.services import rollup_maintenance
+
+    drift = rollup_maintenance.verify(user_id)
+    if not drift:
+        click.echo("Resumo mensal consistente com as transações.")
+        return
+
+    for row in drift:
+        click.echo(
+            f"user={row['user_id']} {row['year']}-{row['month']:02d} "
+            f"categoria={row['category_id']} tipo={row['type']}: "
+            f"esperado {row['expected_total']:.2f} ({row['expected_count']}), "
+            f"gravado {row['stored_total']:.2f} ({row['stored_count']})"
+        )
+    raise click.ClickException(f"{len(drift)} divergência(s) encontrada(s). Use 'flask rollups rebuild'.")
+
+
+@leaderboard_cli.command('rebuild')
+def rebuild_leaderboard():
+    """
+    Recarrega o ranking a partir da tabela de usuários. Útil com o backend
+    redis; no backend memory cada worker reconstrói o seu no primeiro uso.
+    """
+    from app.services import leaderboard
+
+    leaderboard.rebuild()
+    click.echo("Ranking reconstruído a partir do banco.")
+
+
+@xp_cli.command('recalc-levels')
+def recalc_levels():
+    """Recalcula o nível de todos os usuários a partir do XP (ex.: após mudar a curva)."""
+    from app.services.levels import recalculate_all_levels
+
+    changed = recalculate_all_levels(db.session)
+    db.session.commit()
+    click.echo(f"Níveis recalculados: {changed} usuário(s) alterado(s).")
+
+
+@money_cli.command('backfill')
+@click.option('--batch-size', type=int, default=5000, show_default=True, help='Faixa de ids por lote.')
+@click.option('--pause', type=float, default=0.0, show_default=True,
+              help='Segundos de espera entre lotes (alivia o banco em produção).')
+def backfill_money(batch_size, pause):
+    """Preenche transactions.amount_cents a partir da coluna float, em lotes."""
+    from app.services import money
+
+    def progress(updated, last_id):
+        click.echo(f"{updated} transação(ões) convertida(s), até o id {last_id}.")
+
+    updated = money.backfill_amount_cents(batch_size=batch_size, pause=pause, progress=progress)
+    click.echo(f"Conversão concluída: {updated} transação(ões); pendentes: {money.pending_backfill()}.")
+
+
+@money_cli.command('status')
+def money_status():
+    """Mostra quantas transações ainda não têm o valor em centavos."""
+    from app.services import money
+
+    click.echo(f"Transações sem amount_cents: {money.pending_backfill()}.")
+
+
+@click.command('seed')
+@click.option('--users', type=int, default=1000, show_default=True, help='Usuários a gerar.')
+@click.option('--months', type=int, default=24, show_default=True, help='Meses de histórico.')
+@click.option('--per-month', type=float, default=30, show_default=True,
+              help='Média de transações por usuário por mês.')
+@click.option('--seed', 'random_seed', type=int, default=42, show_default=True, help='Semente do gerador.')
+@click.option('--batch-size', type=int, default=10000, show_default=True, help='Linhas por INSERT.')
+@click.option('--users-per-commit', type=int, default=1000, show_default=True, help='Usuários por commit.')
+@click.option('--prefix', default='seed', show_default=True, help='Prefixo dos nomes de usuário.')
+@click.option('--password', default='seed123', show_default=True, help='Senha de todos os usuários gerados.')
+@with_appcontext
+def seed_data(users, months, per_month, random_seed, batch_size, users_per_commit, prefix, password):
+    """Gera usuários, transações sazonais e XP sintéticos em volume (testes de capacidade)."""
+    from app.services import leaderboard
+    from app.services.seeding import Seeder
+
+    seeder = Seeder(users, months=months, per_month=per_month, seed=random_seed,
+                    batch_size=batch_size, prefix=prefix, password=password, progress=click.echo)
+    stats = seeder.run(users_per_commit=users_per_commit)
+
+    leaderboard.rebuild()
+    click.echo(f"Gerados {stats['users']} usuários, {stats['transactions']} transações e "
+               f"{stats['summaries']} linhas de resumo mensal.")
@@ -4,9 +4,10 @@ Isso resolve problemas de importação circular.
 """
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
+from app.services.db_routing import RoutingSession
 
-# Inicializar SQLAlchemy
-db = SQLAlchemy()
+# Inicializar SQLAlchemy (sessão que pode ler de réplicas, ver services/db_routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Inicializar JWTManager (será configurado posteriormente)
 jwt = JWTManager()
\ No newline at end of file
@@ -0,0 +1,42 @@
+from app import db
+from datetime import datetime
+from app.services.money import from_cents
+
+class MonthlySummary(db.Model):
+    """
+    Agregado mensal por usuário, categoria e tipo de transação.
+    Mantido incrementalmente a cada criação, edição ou exclusão de transação
+    (ver app/services/rollups.py) para que o resumo financeiro não precise
+    percorrer todo o histórico do usuário.
+    """
+    __tablename__ = 'monthly_summaries'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'year', 'month', 'category_id', 'type', name='uq_monthly_summary_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('transaction_categories.id'), nullable=False)
+    type = db.Column(db.String(20), nullable=False)  # 'income' ou 'expense'
+    # Total em centavos; 'total' (float) continua sendo gravado até o fim da
+    # migração para centavos (ver app/services/money.py)
+    total_cents = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    total = db.Column(db.Float, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'year': self.year,
+            'month': self.month,
+            'category_id': self.category_id,
+            'type': self.type,
+            'total': from_cents(self.total_cents),
+            'count': self.count
+        }
+
+    def __repr__(self):
+        return f'<MonthlySummary {self.user_id} {self.year}-{self.month:02d} {self.category_id}>'
@@ -1,6 +1,10 @@
 from app import db
 from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.ext.hybrid import hybrid_property
 from app.models.user import User
+from app.services.categories import CATEGORY_FIELDS, category_registry
+from app.services.money import from_cents, legacy_to_cents, legacy_value_to_cents, to_cents
 
 class TransactionCategory(db.Model):
     __tablename__ = 'transaction_categories'
@@ -14,25 +18,34 @@ class TransactionCategory(db.Model):
     
     transactions = db.relationship('Transaction', backref='category', lazy=True)
     
+    # Campos de to_row(), na mesma ordem (e os mesmos de CategoryEntry)
+    ROW_FIELDS = CATEGORY_FIELDS
+    
+    def to_row(self):
+        return (self.id, self.name, self.description, self.type, self.icon, self.color)
+    
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'type': self.type,
-            'icon': self.icon,
-            'color': self.color
-        }
+        return dict(zip(self.ROW_FIELDS, self.to_row()))
         
     def __repr__(self):
         return f'<TransactionCategory {self.name}>'
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Consultas sempre filtram por usuário e intervalo de datas
+        # (ver migrations/versions/0003_transaction_indexes.py)
+        db.Index('ix_transactions_user_date_id', 'user_id', 'date', 'id'),
+        db.Index('ix_transactions_user_category_date', 'user_id', 'category_id', 'date'),
+        db.Index('ix_transactions_user_type_date', 'user_id', 'type', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(200), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    # Valor em centavos; a antiga coluna float 'amount' continua sendo gravada
+    # até o fim da migração (ver app/services/money.py)
+    amount_cents = db.Column(db.BigInteger, nullable=True)
+    legacy_amount = db.Column('amount', db.Float, nullable=False)
     type = db.Column(db.String(20), nullable=False)  # 'income' ou 'expense'
     date = db.Column(db.Date, nullable=False, default=datetime.utcnow().date)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -41,18 +54,66 @@ class Transaction(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('transaction_categories.id'), nullable=False)
     
+    # Campos de to_row(), na mesma ordem; a categoria fica de fora (só o id)
+    ROW_FIELDS = ('id', 'description', 'amount', 'type', 'date', 'created_at', 'user_id', 'category_id')
+    
+    def to_row(self):
+        """
+        Valores de ROW_FIELDS em uma tupla, sem dicionário intermediário. Datas
+        saem como date/datetime; quem formata é o provedor JSON.
+        """
+        return (self.id, self.description, self.amount, self.type, self.date,
+                self.created_at, self.user_id, self.category_id)
+    
+    @classmethod
+    def row_columns(cls):
+        """Colunas de ROW_FIELDS para consultas sem objetos ORM (o valor vem em centavos, como 'cents')."""
+        return (cls.id, cls.description, cls.cents.label('cents'), cls.type, cls.date,
+                cls.created_at, cls.user_id, cls.category_id)
+    
     def to_dict(self):
-        return {
-            'id': self.id,
-            'description': self.description,
-            'amount': self.amount,
-            'type': self.type,
-            'date': self.date.strftime('%Y-%m-%d'),
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'user_id': self.user_id,
-            'category_id': self.category_id,
-            'category': self.category.to_dict() if self.category else None
-        }
+        data = dict(zip(self.ROW_FIELDS, self.to_row()))
+        data['category'] = self.category_dict()
+        return data
+    
+    @hybrid_property
+    def amount(self):
+        # Valor em reais, como a API sempre expôs
+        if self.amount_cents is not None:
+            return from_cents(self.amount_cents)
+        return self.legacy_amount
+    
+    @amount.setter
+    def amount(self, value):
+        self.amount_cents = to_cents(value)
+        self.legacy_amount = from_cents(self.amount_cents)
+    
+    @amount.expression
+    def amount(cls):
+        return cls.cents / 100.0
+    
+    @hybrid_property
+    def cents(self):
+        if self.amount_cents is not None:
+            return self.amount_cents
+        return legacy_value_to_cents(self.legacy_amount)
+    
+    @cents.expression
+    def cents(cls):
+        # Linhas ainda não convertidas pelo backfill usam a coluna antiga
+        return func.coalesce(cls.amount_cents, legacy_to_cents(cls.legacy_amount))
+    
+    @staticmethod
+    def amount_values(cents):
+        """Colunas de valor para INSERTs em lote (centavos e a coluna antiga)."""
+        return {'amount_cents': cents, 'legacy_amount': from_cents(cents)}
+    
+    def category_dict(self):
+        # Categoria vem do registro em memória, sem carregar self.category
+        category = category_registry.get(self.category_id)
+        if category is None:
+            return self.category.to_dict() if self.category else None
+        return category.to_dict()
         
     def __repr__(self):
         return f'<Transaction {self.description}>'
\ No newline at end of file
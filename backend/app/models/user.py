@@ -1,6 +1,13 @@
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from sqlalchemy import func, or_, update
+from app.services import leaderboard
+from app.services.passwords import get_hasher
+from app.services.user_cache import mark_changed
+from app.services.levels import level_for_xp, next_level_xp
+
+# Quantidade de XP concedida pelo login diário
+DAILY_LOGIN_XP = 50
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -16,69 +23,88 @@ class User(db.Model):
     last_login = db.Column(db.DateTime, nullable=True)
     
     # Novos campos para sistema de XP
-    xp = db.Column(db.Integer, default=0)
+    xp = db.Column(db.Integer, default=0, index=True)
     level = db.Column(db.Integer, default=1)
     last_xp_grant = db.Column(db.Date, nullable=True)
     
+    # Versão dos dados do usuário, incrementada a cada escrita (ver
+    # app/services/data_version.py); usada nos ETags das rotas de leitura
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    data_updated_at = db.Column(db.DateTime, nullable=True)
+    
+    # Hash e verificação rodam no pool de processos (app/services/passwords.py)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_hasher().hash(password)
         
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return get_hasher().verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        # Hash gravado com parâmetros diferentes dos configurados
+        return get_hasher().needs_rehash(self.password_hash)
     
     def update_last_login(self):
+        # Sem commit: o login grava tudo em uma única transação
         self.last_login = datetime.utcnow()
-        db.session.commit()
     
     # Nova função para calcular o XP necessário para o próximo nível
     def get_next_level_xp(self):
         # Fórmula para calcular o XP necessário para o próximo nível
         # Cada nível requer mais XP que o anterior (100 * level ao quadrado)
-        return 100 * (self.level ** 2)
+        return next_level_xp(self.level)
     
     # Nova função para adicionar XP e atualizar nível se necessário
     def add_xp(self, amount):
+        """Soma XP e atualiza o nível. Não faz commit; quem chama confirma a transação."""
         self.xp += amount
         
-        # Verificar se é necessário subir de nível
-        while self.xp >= self.get_next_level_xp():
-            self.level += 1
+        # Atualizar o nível diretamente a partir do XP
+        self.level = level_for_xp(self.xp)
         
-        db.session.commit()
         return self.xp, self.level
     
     # Nova função para conceder XP por login diário
     def grant_daily_login_xp(self):
-        today = datetime.utcnow().date()
+        """
+        Concede o XP diário com um UPDATE condicional (só se last_xp_grant não
+        for hoje), então logins simultâneos concedem no máximo uma vez.
+        Não faz commit; quem chama confirma junto com as demais escritas.
+        """
+        now = datetime.utcnow()
+        today = now.date()
         
-        # Verificar se já recebeu XP hoje
-        if self.last_xp_grant == today:
-            return False, self.xp, self.level
+        result = db.session.execute(
+            update(User)
+            .where(User.id == self.id, or_(User.last_xp_grant.is_(None), User.last_xp_grant != today))
+            .values(
+                xp=func.coalesce(User.xp, 0) + DAILY_LOGIN_XP,
+                last_xp_grant=today,
+                data_version=User.data_version + 1,
+                data_updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
         
-        # Quantidade de XP concedida pelo login diário
-        daily_xp = 50
-        
-        # Atualizar a data do último ganho de XP
-        self.last_xp_grant = today
+        # Outra requisição já concedeu o XP de hoje
+        if result.rowcount != 1:
+            db.session.refresh(self, ['xp', 'level', 'last_xp_grant'])
+            return False, self.xp, self.level
         
-        # Adicionar o XP
-        self.add_xp(daily_xp)
+        db.session.refresh(self, ['xp', 'last_xp_grant', 'data_version'])
+        self.level = level_for_xp(self.xp)
+        leaderboard.schedule_update(db.session, self.id, self.xp)
+        mark_changed(db.session, [self.id])
         
-        return True, self.xp, self.level, daily_xp
+        return True, self.xp, self.level, DAILY_LOGIN_XP
     
     transactions = db.relationship('Transaction', backref='user', lazy=True, cascade="all, delete-orphan")
+    monthly_summaries = db.relationship('MonthlySummary', lazy=True, cascade="all, delete-orphan")
 
     # Atualização do método to_dict para incluir dados de XP
     def to_dict(self, include_transactions=False):
-        # Verificar e atualizar o nível se necessário
-        level_changed = False
-        while self.xp >= self.get_next_level_xp():
-            self.level += 1
-            level_changed = True
-        
-        # Se o nível mudou, salvar as alterações
-        if level_changed:
-            db.session.commit()
+        # Nível calculado a partir do XP, sem gravar nada (leitura não escreve;
+        # níveis desatualizados são corrigidos por 'flask xp recalc-levels')
+        level = level_for_xp(self.xp)
         
         user_dict = {
             'id': self.id,
@@ -86,25 +112,24 @@ class User(db.Model):
             'email': self.email,
             'phone': self.phone,
             'full_name': self.full_name,
-            'birth_date': self.birth_date.strftime('%Y-%m-%d'),
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'last_login': self.last_login.strftime('%Y-%m-%d %H:%M:%S') if self.last_login else None,
+            'birth_date': self.birth_date,
+            'created_at': self.created_at,
+            'last_login': self.last_login,
             'xp': self.xp,
-            'level': self.level,
-            'next_level_xp': self.get_next_level_xp(),
-            'last_xp_grant': self.last_xp_grant.strftime('%Y-%m-%d') if self.last_xp_grant else None
+            'level': level,
+            'next_level_xp': next_level_xp(level),
+            'last_xp_grant': self.last_xp_grant
         }
         
         if include_transactions:
-            # Cálculo de sumário financeiro
-            income = sum(t.amount for t in self.transactions if t.type == 'income')
-            expenses = sum(t.amount for t in self.transactions if t.type == 'expense')
-            balance = income - expenses
+            # Cálculo de sumário financeiro (agregado no banco)
+            from app.services.aggregation import summarize_period
+            summary = summarize_period(self.id)
             
             user_dict['financial_summary'] = {
-                'income': income,
-                'expenses': expenses,
-                'balance': balance
+                'income': summary['income'],
+                'expenses': summary['expenses'],
+                'balance': summary['balance']
             }
         
         return user_dict
@@ -0,0 +1,138 @@
+"""
+Agregações financeiras feitas no banco (GROUP BY) em vez de laços em Python.
+
+Usado pelo resumo financeiro (/summary) e por User.to_dict(include_transactions=True).
+Os filtros aceitos são os mesmos de GET /transactions.
+"""
+import datetime
+
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models.transaction import Transaction, TransactionCategory
+from app.services import rollups
+from app.services.money import from_cents
+
+FILTER_ARGS = ('type', 'category_id', 'start_date', 'end_date')
+
+
+def parse_filters(args):
+    """
+    Lê os filtros opcionais de uma requisição (request.args).
+    Lança ValueError com a mensagem de erro para o cliente se uma data for inválida.
+    """
+    filters = {
+        'type': args.get('type') or None,
+        'category_id': args.get('category_id') or None,
+        'start_date': None,
+        'end_date': None
+    }
+
+    for field in ('start_date', 'end_date'):
+        value = args.get(field)
+        if value:
+            try:
+                filters[field] = datetime.datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError(f'Formato de data inválido para {field}. Use YYYY-MM-DD')
+
+    return filters
+
+
+def has_filters(args):
+    return any(args.get(field) for field in FILTER_ARGS)
+
+
+def apply_filters(query, user_id, filters):
+    """Aplica o filtro de usuário e os filtros opcionais a uma consulta sobre Transaction."""
+    query = query.filter(Transaction.user_id == user_id)
+
+    if filters.get('type'):
+        query = query.filter(Transaction.type == filters['type'])
+
+    if filters.get('category_id'):
+        query = query.filter(Transaction.category_id == filters['category_id'])
+
+    if filters.get('start_date'):
+        query = query.filter(Transaction.date >= filters['start_date'])
+
+    if filters.get('end_date'):
+        query = query.filter(Transaction.date <= filters['end_date'])
+
+    return query
+
+
+def totals_by_category(user_id, filters=None):
+    """Retorna (tipo, nome da categoria, total em centavos) com uma única consulta agrupada."""
+    query = db.session.query(
+        Transaction.type,
+        TransactionCategory.name,
+        func.sum(Transaction.cents)
+    ).join(
+        TransactionCategory, TransactionCategory.id == Transaction.category_id
+    )
+    query = apply_filters(query, user_id, filters or {})
+
+    return query.group_by(Transaction.type, TransactionCategory.name).all()
+
+
+def build_summary(rows):
+    """
+    Monta o dicionário de resumo a partir de linhas (tipo, categoria, total em
+    centavos). As somas são feitas em centavos e convertidas para reais só no fim.
+    """
+    income = 0
+    expenses = 0
+    income_by_category = {}
+    expense_by_category = {}
+
+    for type_, category_name, cents in rows:
+        cents = int(cents or 0)
+        if type_ == 'income':
+            income += cents
+            income_by_category[category_name] = income_by_category.get(category_name, 0) + cents
+        else:
+            expenses += cents
+            expense_by_category[category_name] = expense_by_category.get(category_name, 0) + cents
+
+    return {
+        'income': from_cents(income),
+        'expenses': from_cents(expenses),
+        'balance': from_cents(income - expenses),
+        'income_by_category': {name: from_cents(total) for name, total in income_by_category.items()},
+        'expense_by_category': {name: from_cents(total) for name, total in expense_by_category.items()}
+    }
+
+
+def summarize(user_id, filters=None):
+    """Resumo financeiro para um conjunto arbitrário de filtros."""
+    return build_summary(totals_by_category(user_id, filters))
+
+
+def period_start(period):
+    """Primeiro dia do período ('month' ou 'week'); None para 'all'."""
+    today = datetime.datetime.utcnow().date()
+
+    if period == 'month':
+        return today.replace(day=1)
+    if period == 'week':
+        return today - datetime.timedelta(days=today.weekday())
+    return None
+
+
+def summarize_period(user_id, period='all'):
+    """
+    Resumo financeiro por período ('all', 'month' ou 'week').
+    'all' e 'month' usam o resumo mensal; a semana pode atravessar dois meses,
+    então é agrupada diretamente das transações a partir de segunda-feira.
+    """
+    start = period_start(period)
+
+    if period == 'month':
+        rows = rollups.totals_by_category(user_id, since=(start.year, start.month))
+    elif period == 'week':
+        rows = totals_by_category(user_id, {'start_date': start})
+    else:
+        rows = rollups.totals_by_category(user_id)
+
+    return build_summary(rows)
@@ -0,0 +1,81 @@
+"""
+Preparação do banco: tabelas, categorias padrão e usuário administrador.
+
+Roda uma vez por implantação ('flask bootstrap'), não a cada worker. Só em
+desenvolvimento create_app() ainda chama bootstrap_database() sozinho (ver
+BOOTSTRAP_ON_START). Bancos já existentes recebem alterações de esquema pelo
+executor de migrações (python -m migrations.runner upgrade).
+"""
+import datetime
+import logging
+import os
+
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATEGORIES = [
+    {'name': 'Salário', 'type': 'income', 'description': 'Rendimentos do trabalho', 'icon': 'money-bill', 'color': '#4CAF50'},
+    {'name': 'Investimentos', 'type': 'income', 'description': 'Rendimentos de investimentos', 'icon': 'chart-line', 'color': '#2196F3'},
+    {'name': 'Presentes', 'type': 'income', 'description': 'Dinheiro recebido como presente', 'icon': 'gift', 'color': '#9C27B0'},
+    {'name': 'Outros (Receita)', 'type': 'income', 'description': 'Outras fontes de receita', 'icon': 'plus-circle', 'color': '#607D8B'},
+
+    {'name': 'Alimentação', 'type': 'expense', 'description': 'Mercado, restaurantes e delivery', 'icon': 'utensils', 'color': '#F44336'},
+    {'name': 'Moradia', 'type': 'expense', 'description': 'Aluguel, contas e manutenção', 'icon': 'home', 'color': '#FF9800'},
+    {'name': 'Transporte', 'type': 'expense', 'description': 'Combustível, passagens e manutenção', 'icon': 'car', 'color': '#795548'},
+    {'name': 'Lazer', 'type': 'expense', 'description': 'Entretenimento e hobbies', 'icon': 'gamepad', 'color': '#E91E63'},
+    {'name': 'Saúde', 'type': 'expense', 'description': 'Medicamentos, consultas e planos', 'icon': 'heartbeat', 'color': '#00BCD4'},
+    {'name': 'Educação', 'type': 'expense', 'description': 'Cursos, livros e materiais', 'icon': 'graduation-cap', 'color': '#3F51B5'},
+    {'name': 'Compras', 'type': 'expense', 'description': 'Roupas, eletrônicos e outros', 'icon': 'shopping-bag', 'color': '#9E9E9E'},
+    {'name': 'Assinaturas', 'type': 'expense', 'description': 'Serviços recorrentes', 'icon': 'calendar-check', 'color': '#8BC34A'},
+    {'name': 'Outros (Despesa)', 'type': 'expense', 'description': 'Gastos diversos', 'icon': 'minus-circle', 'color': '#607D8B'}
+]
+
+
+def seed_categories():
+    """Cria as categorias padrão que faltam (uma consulta e um commit). Retorna quantas criou."""
+    from app.models.transaction import TransactionCategory
+
+    existing = {name for (name,) in db.session.query(TransactionCategory.name)}
+    missing = [TransactionCategory(**data) for data in DEFAULT_CATEGORIES if data['name'] not in existing]
+    if missing:
+        db.session.add_all(missing)
+        db.session.commit()
+    return len(missing)
+
+
+def seed_admin():
+    """Cria o usuário administrador (ADMIN_*) se ele não existir. Retorna o nome criado ou None."""
+    from app.models.user import User
+
+    admin_username = os.getenv('ADMIN_USERNAME', 'admin')
+    if db.session.query(User.id).filter_by(username=admin_username).first():
+        return None
+
+    admin_user = User(
+        username=admin_username,
+        email=os.getenv('ADMIN_EMAIL', 'admin@example.com'),
+        phone=os.getenv('ADMIN_PHONE', '(00) 00000-0000'),
+        full_name='Administrador do Sistema',
+        birth_date=datetime.date(2000, 1, 1)
+    )
+    admin_user.set_password(os.getenv('ADMIN_PASSWORD', 'admin123'))
+    db.session.add(admin_user)
+    db.session.commit()
+    return admin_username
+
+
+def bootstrap_database():
+    """Cria as tabelas que faltam e os dados iniciais. Pode ser executado mais de uma vez."""
+    db.create_all()
+    logger.info("Tabelas criadas com sucesso!")
+
+    created = seed_categories()
+    if created:
+        logger.info("Categorias padrão criadas: %s", created)
+
+    admin_username = seed_admin()
+    if admin_username:
+        logger.info("Usuário administrador criado: %s", admin_username)
+
+    return {'categories': created, 'admin': admin_username}
@@ -0,0 +1,331 @@
+"""
+Séries de fluxo de caixa (receitas, despesas e saldo) por dia, semana, mês
+ou ano, para gráficos.
+
+O agrupamento é feito no banco:
+- mês e ano: os meses inteiros do intervalo vêm do resumo mensal
+  (monthly_summaries), que já é mantido a cada escrita; só os meses
+  incompletos nas pontas do intervalo são agrupados a partir das transações.
+  Um gráfico mensal de 5 anos lê ~60 linhas por categoria, não 5 anos de
+  transações;
+- dia e semana: GROUP BY sobre as transações. Os períodos já encerrados ficam
+  em cache no worker, associados à versão dos dados do usuário
+  (users.data_version): enquanto ela não muda, só o período atual, os que
+  faltam no cache e os períodos cortados pelas pontas do intervalo pedido
+  são consultados.
+"""
+import datetime
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import Date, func, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from app.extensions import db
+from app.models.summary import MonthlySummary
+from app.models.transaction import Transaction, TransactionCategory
+from app.services.money import from_cents
+
+INTERVALS = ('day', 'week', 'month', 'year')
+
+# Intervalo padrão quando start_date não é informado
+DEFAULT_SPAN = {'day': 30, 'week': 12, 'month': 12, 'year': 5}
+
+MAX_BUCKETS = 1000
+CACHE_MAX_ENTRIES = 2048
+
+
+class week_start(FunctionElement):
+    """Segunda-feira da semana da data (semana ISO), calculada no banco."""
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(week_start)
+def _week_start_mysql(element, compiler, **kw):
+    arg = compiler.process(list(element.clauses)[0], **kw)
+    return f'DATE_SUB({arg}, INTERVAL WEEKDAY({arg}) DAY)'
+
+
+@compiles(week_start, 'sqlite')
+def _week_start_sqlite(element, compiler, **kw):
+    arg = compiler.process(list(element.clauses)[0], **kw)
+    return f"date({arg}, '-6 days', 'weekday 1')"
+
+
+@compiles(week_start, 'postgresql')
+def _week_start_postgresql(element, compiler, **kw):
+    arg = compiler.process(list(element.clauses)[0], **kw)
+    return f"CAST(date_trunc('week', {arg}) AS DATE)"
+
+
+# -- Períodos --
+
+def bucket_start(date, interval):
+    if interval == 'week':
+        return date - datetime.timedelta(days=date.weekday())
+    if interval == 'month':
+        return date.replace(day=1)
+    if interval == 'year':
+        return date.replace(month=1, day=1)
+    return date
+
+
+def next_bucket(start, interval):
+    if interval == 'day':
+        return start + datetime.timedelta(days=1)
+    if interval == 'week':
+        return start + datetime.timedelta(days=7)
+    if interval == 'month':
+        return (start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return start.replace(year=start.year + 1)
+
+
+def bucket_label(start, interval):
+    if interval == 'month':
+        return start.strftime('%Y-%m')
+    if interval == 'year':
+        return str(start.year)
+    return start.isoformat()
+
+
+def default_start(end, interval):
+    span = DEFAULT_SPAN[interval]
+    if interval == 'day':
+        return end - datetime.timedelta(days=span - 1)
+    if interval == 'week':
+        return bucket_start(end, 'week') - datetime.timedelta(weeks=span - 1)
+    if interval == 'month':
+        months = end.year * 12 + end.month - 1 - (span - 1)
+        return datetime.date(months // 12, months % 12 + 1, 1)
+    return datetime.date(end.year - span + 1, 1, 1)
+
+
+def buckets(start, end, interval):
+    current = bucket_start(start, interval)
+    result = []
+    while current <= end:
+        result.append(current)
+        current = next_bucket(current, interval)
+    return result
+
+
+# -- Consultas --
+
+def _empty():
+    return {'income': 0, 'expense': 0, 'income_by_category': {}, 'expense_by_category': {}}
+
+
+def _accumulate(totals, bucket, type_, category_name, cents):
+    entry = totals.setdefault(bucket, _empty())
+    kind = 'income' if type_ == 'income' else 'expense'
+    cents = int(cents or 0)
+    entry[kind] += cents
+    if category_name is not None:
+        by_category = entry[f'{kind}_by_category']
+        by_category[category_name] = by_category.get(category_name, 0) + cents
+
+
+def today():
+    # Mesma referência de 'hoje' do resto da API (UTC)
+    return datetime.datetime.utcnow().date()
+
+
+def _transaction_totals(user_id, interval, ranges, by_category, category_id, type_, totals):
+    """Agrupa as transações por período, tipo (e categoria) dentro dos intervalos de datas."""
+    if not ranges:
+        return
+
+    if interval == 'day':
+        bucket_columns = [Transaction.date]
+    elif interval == 'week':
+        bucket_columns = [week_start(Transaction.date)]
+    else:
+        year = func.extract('year', Transaction.date)
+        bucket_columns = [year] if interval == 'year' else [year, func.extract('month', Transaction.date)]
+
+    columns = bucket_columns + [Transaction.type]
+    if by_category:
+        columns.append(TransactionCategory.name)
+
+    query = db.session.query(*columns, func.sum(Transaction.cents)).filter(
+        Transaction.user_id == user_id,
+        or_(*[Transaction.date.between(low, high) for low, high in ranges])
+    )
+    if by_category:
+        query = query.join(TransactionCategory, TransactionCategory.id == Transaction.category_id)
+    if category_id is not None:
+        query = query.filter(Transaction.category_id == category_id)
+    if type_:
+        query = query.filter(Transaction.type == type_)
+
+    for row in query.group_by(*columns):
+        bucket = _row_bucket(row, interval)
+        _accumulate(totals, bucket, row.type, row.name if by_category else None, row[-1])
+
+
+def _row_bucket(row, interval):
+    if interval == 'year':
+        return datetime.date(int(row[0]), 1, 1)
+    if interval == 'month':
+        return datetime.date(int(row[0]), int(row[1]), 1)
+    value = row[0]
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    return value
+
+
+def _rollup_totals(user_id, interval, first_month, last_month, by_category, category_id, type_, totals):
+    """Agrupa o resumo mensal dos meses inteiros [first_month, last_month] por mês ou ano."""
+    month_index = MonthlySummary.year * 12 + MonthlySummary.month
+    bucket_columns = [MonthlySummary.year] if interval == 'year' else [MonthlySummary.year, MonthlySummary.month]
+
+    columns = bucket_columns + [MonthlySummary.type]
+    if by_category:
+        columns.append(TransactionCategory.name)
+
+    query = db.session.query(*columns, func.sum(MonthlySummary.total_cents)).filter(
+        MonthlySummary.user_id == user_id,
+        MonthlySummary.count > 0,
+        month_index.between(first_month.year * 12 + first_month.month, last_month.year * 12 + last_month.month)
+    )
+    if by_category:
+        query = query.join(TransactionCategory, TransactionCategory.id == MonthlySummary.category_id)
+    if category_id is not None:
+        query = query.filter(MonthlySummary.category_id == category_id)
+    if type_:
+        query = query.filter(MonthlySummary.type == type_)
+
+    for row in query.group_by(*columns):
+        bucket = _row_bucket(row, interval)
+        _accumulate(totals, bucket, row.type, row.name if by_category else None, row[-1])
+
+
+def _monthly_series(user_id, interval, start, end, by_category, category_id, type_):
+    totals = {}
+    first_full = start if start.day == 1 else next_bucket(bucket_start(start, 'month'), 'month')
+    after_last_full = bucket_start(end + datetime.timedelta(days=1), 'month')
+
+    if first_full < after_last_full:
+        last_full = bucket_start(after_last_full - datetime.timedelta(days=1), 'month')
+        _rollup_totals(user_id, interval, first_full, last_full, by_category, category_id, type_, totals)
+        # Pontas com meses incompletos vêm das transações
+        edges = []
+        if start < first_full:
+            edges.append((start, first_full - datetime.timedelta(days=1)))
+        if after_last_full <= end:
+            edges.append((after_last_full, end))
+    else:
+        edges = [(start, end)]
+
+    _transaction_totals(user_id, interval, edges, by_category, category_id, type_, totals)
+    return totals
+
+
+class SeriesCache:
+    """Períodos encerrados de séries diárias/semanais, por usuário e versão dos dados."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return {}
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, buckets_):
+        with self._lock:
+            entry = self._entries.get(key)
+            stored = dict(entry[1]) if entry is not None and entry[0] == version else {}
+            stored.update(buckets_)
+            self._entries[key] = (version, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+series_cache = SeriesCache()
+
+
+def _contiguous_ranges(bucket_list, interval, start, end):
+    """Agrupa períodos consecutivos em intervalos de datas, cortados em [start, end]."""
+    ranges = []
+    for bucket in bucket_list:
+        low = max(bucket, start)
+        high = min(next_bucket(bucket, interval) - datetime.timedelta(days=1), end)
+        if ranges and ranges[-1][1] + datetime.timedelta(days=1) == low:
+            ranges[-1] = (ranges[-1][0], high)
+        else:
+            ranges.append((low, high))
+    return ranges
+
+
+def _cached_series(user_id, interval, start, end, by_category, category_id, type_, version):
+    current_day = today()
+    key = (user_id, interval, by_category, category_id, type_)
+    cached = series_cache.get(key, version)
+
+    totals = {}
+    missing = []
+    complete = []
+    for bucket in buckets(start, end, interval):
+        bucket_end = next_bucket(bucket, interval) - datetime.timedelta(days=1)
+        # Períodos cortados pelo início ou fim do intervalo nunca vêm do cache
+        inside = bucket >= start and bucket_end <= end
+        if inside and bucket in cached:
+            totals[bucket] = cached[bucket]
+            continue
+        missing.append(bucket)
+        if inside and bucket_end < current_day:
+            complete.append(bucket)
+
+    if missing:
+        fresh = {}
+        _transaction_totals(user_id, interval, _contiguous_ranges(missing, interval, start, end),
+                            by_category, category_id, type_, fresh)
+        for bucket in missing:
+            totals[bucket] = fresh.get(bucket, _empty())
+
+        # Só períodos encerrados e inteiros dentro do intervalo pedido vão para o cache
+        if complete and version is not None:
+            series_cache.put(key, version, {bucket: totals[bucket] for bucket in complete})
+
+    return totals
+
+
+def series(user_id, interval, start, end, by_category=False, category_id=None, type_=None, version=None):
+    """
+    Retorna a lista de períodos de start a end com receitas, despesas e saldo
+    (e por categoria, se pedido). Os períodos sem transações vêm zerados;
+    type_ ('income' ou 'expense') limita a série a um dos lados.
+    """
+    if interval in ('month', 'year'):
+        totals = _monthly_series(user_id, interval, start, end, by_category, category_id, type_)
+    else:
+        totals = _cached_series(user_id, interval, start, end, by_category, category_id, type_, version)
+
+    result = []
+    for bucket in buckets(start, end, interval):
+        entry = totals.get(bucket) or _empty()
+        item = {
+            'period': bucket_label(bucket, interval),
+            'start_date': bucket.isoformat(),
+            'income': from_cents(entry['income']),
+            'expense': from_cents(entry['expense']),
+            'balance': from_cents(entry['income'] - entry['expense'])
+        }
+        if by_category:
+            item['income_by_category'] = {name: from_cents(total) for name, total in entry['income_by_category'].items()}
+            item['expense_by_category'] = {name: from_cents(total) for name, total in entry['expense_by_category'].items()}
+        result.append(item)
+    return result
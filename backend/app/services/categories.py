@@ -0,0 +1,124 @@
+"""
+Registro em memória das categorias de transação.
+
+As categorias são poucas e quase nunca mudam, então cada worker as carrega uma
+única vez e passa a responder validações e serializações sem consultar o banco.
+O registro é imutável: uma alteração de categoria gera um novo snapshot (com
+uma nova versão) em vez de modificar o atual.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+CATEGORY_FIELDS = ('id', 'name', 'description', 'type', 'icon', 'color')
+
+
+@dataclass(frozen=True)
+class CategoryEntry:
+    id: int
+    name: str
+    description: str
+    type: str
+    icon: str
+    color: str
+
+    def to_row(self):
+        return (self.id, self.name, self.description, self.type, self.icon, self.color)
+
+    def to_dict(self):
+        # Mais barato que dataclasses.asdict(), que copia recursivamente
+        return dict(zip(CATEGORY_FIELDS, self.to_row()))
+
+
+@dataclass(frozen=True)
+class CategorySnapshot:
+    entries: tuple
+    by_id: MappingProxyType
+    by_name: MappingProxyType
+    version: str
+    loaded_at: float
+
+
+class CategoryRegistry:
+    def __init__(self, ttl=0):
+        # ttl > 0 faz o snapshot expirar, para workers que não veem as
+        # alterações feitas por outros processos
+        self.ttl = ttl
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from app.models.transaction import TransactionCategory
+
+        entries = tuple(
+            CategoryEntry(c.id, c.name, c.description, c.type, c.icon, c.color)
+            for c in TransactionCategory.query.order_by(TransactionCategory.id).all()
+        )
+        digest = hashlib.sha1(repr(entries).encode()).hexdigest()[:16]
+        return CategorySnapshot(
+            entries=entries,
+            by_id=MappingProxyType({entry.id: entry for entry in entries}),
+            by_name=MappingProxyType({entry.name.casefold(): entry for entry in entries}),
+            version=digest,
+            loaded_at=time.monotonic()
+        )
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and (not self.ttl or time.monotonic() - snapshot.loaded_at < self.ttl):
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is snapshot:
+                self._snapshot = self._load()
+            return self._snapshot
+
+    def all(self):
+        return self.snapshot().entries
+
+    def get(self, category_id):
+        """Retorna a categoria ou None se o id não existir (ou não for um inteiro)."""
+        try:
+            return self.snapshot().by_id.get(int(category_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by_name(self, name):
+        return self.snapshot().by_name.get((name or '').strip().casefold())
+
+    @property
+    def version(self):
+        return self.snapshot().version
+
+    def invalidate(self):
+        self._snapshot = None
+
+
+category_registry = CategoryRegistry()
+
+
+# Descartar o snapshot deste worker quando um commit alterar categorias
+@event.listens_for(Session, 'after_flush')
+def _track_category_changes(session, flush_context):
+    from app.models.transaction import TransactionCategory
+
+    changed = session.new | session.dirty | session.deleted
+    if any(isinstance(obj, TransactionCategory) for obj in changed):
+        session.info['categories_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('categories_changed', False):
+        category_registry.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('categories_changed', None)
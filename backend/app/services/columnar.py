@@ -0,0 +1,41 @@
+"""
+Formato colunar para listas de transações (GET /transactions?format=columnar).
+
+Em vez de um objeto por transação, a resposta traz uma lista por campo, na
+ordem de Transaction.ROW_FIELDS, e as categorias uma única vez, em uma tabela
+indexada pelo id (a coluna category_id aponta para ela). As linhas vêm do
+banco só com as colunas necessárias, sem objetos ORM.
+"""
+from app.models.transaction import Transaction
+from app.services.categories import category_registry
+from app.services.money import from_cents
+
+FORMATS = ('rows', 'columnar')
+
+
+def query_columns(query):
+    """Mesma consulta, selecionando apenas as colunas de Transaction.row_columns()."""
+    return query.with_entities(*Transaction.row_columns())
+
+
+def build(rows):
+    """Monta {'fields', 'columns', 'categories', 'count'} a partir das linhas de query_columns()."""
+    fields = Transaction.ROW_FIELDS
+    if rows:
+        columns = dict(zip(fields, (list(values) for values in zip(*rows))))
+    else:
+        columns = {field: [] for field in fields}
+    columns['amount'] = [from_cents(cents) for cents in columns['amount']]
+
+    categories = {}
+    for category_id in set(columns['category_id']):
+        category = category_registry.get(category_id)
+        if category is not None:
+            categories[category_id] = category.to_dict()
+
+    return {
+        'fields': list(fields),
+        'columns': columns,
+        'categories': categories,
+        'count': len(rows)
+    }
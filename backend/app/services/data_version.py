@@ -0,0 +1,62 @@
+"""
+Versão dos dados de cada usuário.
+
+Qualquer flush que crie, altere ou exclua uma transação do usuário, ou altere
+o próprio usuário, incrementa users.data_version e atualiza
+users.data_updated_at na mesma transação de banco. As rotas de leitura usam
+esses valores como ETag/Last-Modified (ver app/utils/http_cache.py).
+
+Escritas feitas direto com instruções SQL (fora do ORM) devem chamar bump().
+Os usuários alterados também saem do cache de usuários após o commit.
+"""
+import datetime
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.user_cache import mark_changed
+
+
+def bump(user_ids, session=None):
+    """Incrementa a versão dos usuários informados, na transação da sessão."""
+    user_ids = {int(user_id) for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    if session is None:
+        from app.extensions import db
+        session = db.session
+
+    mark_changed(session, user_ids)
+    connection = session.connection()
+
+    connection.execute(
+        update(User.__table__)
+        .where(User.__table__.c.id.in_(user_ids))
+        .values(
+            data_version=User.__table__.c.data_version + 1,
+            data_updated_at=datetime.datetime.utcnow()
+        )
+    )
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_touched_users(session, flush_context, instances):
+    touched = session.info.setdefault('touched_users', set())
+
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, Transaction):
+            touched.add(obj.user_id)
+        elif isinstance(obj, User) and obj in session.deleted:
+            mark_changed(session, [obj.id])
+        elif isinstance(obj, User) and obj not in session.new:
+            touched.add(obj.id)
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_touched_users(session, flush_context):
+    touched = session.info.pop('touched_users', None)
+    if touched:
+        bump(touched, session)
@@ -0,0 +1,168 @@
+"""
+Pool de conexões e roteamento de leituras para réplicas.
+
+As rotas marcadas com @read_replica (GET de transações, resumo, ranking e
+categorias) fazem suas consultas em uma das réplicas de DATABASE_REPLICA_URLS;
+todo o resto, incluindo qualquer escrita, vai para o primário.
+
+Réplicas podem estar atrasadas. Para que o usuário sempre veja o que acabou de
+gravar, cada commit que altera dados de um usuário (ver data_version.bump)
+fixa as leituras dele no primário por DB_READ_PIN_SECONDS segundos. As
+fixações ficam na memória do worker ou, com DB_READ_PIN_BACKEND=redis, em
+REDIS_URL, para valerem entre workers.
+
+Para testar localmente, use dois arquivos SQLite (o segundo uma cópia do
+primeiro):
+    DATABASE_URL=sqlite:////tmp/primario.db
+    DATABASE_REPLICA_URLS=sqlite:////tmp/replica.db
+"""
+import random
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_request_context
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session as BaseSession
+
+try:
+    import redis
+except ImportError:  # dependência opcional, só para DB_READ_PIN_BACKEND=redis
+    redis = None
+
+REPLICA_BIND_PREFIX = 'replica_'
+REDIS_KEY_PREFIX = 'pacpoupanca:db-pin:'
+
+
+def parse_replica_urls(value):
+    return [url.strip() for url in (value or '').split(',') if url.strip()]
+
+
+def replica_binds(urls):
+    """Monta as entradas de SQLALCHEMY_BINDS para as réplicas."""
+    return {f'{REPLICA_BIND_PREFIX}{index}': url for index, url in enumerate(urls)}
+
+
+def engine_options(url, env):
+    """Opções do pool de conexões (SQLALCHEMY_ENGINE_OPTIONS) a partir do ambiente."""
+    options = {
+        # Testa a conexão antes de usar: evita erros depois de o MySQL fechar
+        # conexões ociosas (wait_timeout)
+        'pool_pre_ping': env.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'pool_recycle': int(env.get('DB_POOL_RECYCLE', '1800')),
+    }
+
+    # O SQLite usa pools próprios, sem tamanho configurável
+    if not url.startswith('sqlite'):
+        options['pool_size'] = int(env.get('DB_POOL_SIZE', '10'))
+        options['max_overflow'] = int(env.get('DB_MAX_OVERFLOW', '20'))
+        options['pool_timeout'] = int(env.get('DB_POOL_TIMEOUT', '30'))
+
+    return options
+
+
+class MemoryPins:
+    def __init__(self):
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def pin(self, user_ids, seconds):
+        until = time.monotonic() + seconds
+        with self._lock:
+            for user_id in user_ids:
+                self._until[int(user_id)] = until
+
+    def is_pinned(self, user_id):
+        until = self._until.get(int(user_id))
+        if until is None:
+            return False
+        if until < time.monotonic():
+            with self._lock:
+                self._until.pop(int(user_id), None)
+            return False
+        return True
+
+
+class RedisPins:
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("DB_READ_PIN_BACKEND=redis requer o pacote 'redis'")
+        self.client = redis.Redis.from_url(url)
+
+    def pin(self, user_ids, seconds):
+        pipe = self.client.pipeline()
+        for user_id in user_ids:
+            pipe.set(f'{REDIS_KEY_PREFIX}{int(user_id)}', 1, px=int(seconds * 1000))
+        pipe.execute()
+
+    def is_pinned(self, user_id):
+        return bool(self.client.exists(f'{REDIS_KEY_PREFIX}{int(user_id)}'))
+
+
+_replica_keys = []
+_pin_seconds = 0
+_pins = MemoryPins()
+
+
+def configure(app):
+    """Lê as réplicas e a janela de fixação no primário da configuração."""
+    global _replica_keys, _pin_seconds, _pins
+
+    _replica_keys = sorted(key for key in app.config.get('SQLALCHEMY_BINDS', {})
+                           if key.startswith(REPLICA_BIND_PREFIX))
+    _pin_seconds = app.config.get('DB_READ_PIN_SECONDS', 5)
+
+    if app.config.get('DB_READ_PIN_BACKEND', 'memory') == 'redis':
+        _pins = RedisPins(app.config['REDIS_URL'])
+    else:
+        _pins = MemoryPins()
+
+
+def pin_to_primary(user_ids):
+    if _pin_seconds > 0 and user_ids:
+        _pins.pin(user_ids, _pin_seconds)
+
+
+def is_pinned(user_id):
+    return user_id is not None and _pins.is_pinned(user_id)
+
+
+def using_replica():
+    """Indica se a requisição atual está lendo de uma réplica."""
+    return has_request_context() and g.get('db_replica') is not None
+
+
+def read_replica(fn):
+    """
+    Decorador para rotas somente leitura: as consultas da requisição vão para
+    uma réplica, exceto se o usuário gravou algo há pouco.
+    Deve ser usado após o decorador jwt_required().
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _replica_keys and not is_pinned(get_jwt_identity()):
+            g.db_replica = random.choice(_replica_keys)
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+class RoutingSession(Session):
+    """Sessão que envia as leituras das rotas @read_replica para a réplica escolhida."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and (mapper is not None or clause is not None):
+            is_write = clause is not None and getattr(clause, 'is_dml', False)
+            if not is_write and using_replica():
+                return self._db.engines[g.db_replica]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+# Fixar no primário os usuários cujos dados mudaram no commit. Roda antes da
+# invalidação do cache de usuários, que consome a mesma lista.
+@event.listens_for(BaseSession, 'after_commit', insert=True)
+def _pin_changed_users(session):
+    pin_to_primary(session.info.get('changed_users'))
@@ -0,0 +1,88 @@
+"""
+Exportação do histórico de transações em NDJSON ou CSV.
+
+As linhas são lidas do banco em blocos com um cursor do lado do servidor
+(yield_per), em ordem (date, id), e cada bloco é convertido em texto e
+entregue ao cliente antes do próximo ser lido. A memória usada não depende
+do tamanho do histórico.
+"""
+import csv
+import io
+
+from app.models.transaction import Transaction
+from app.services import aggregation
+from app.services.categories import category_registry
+from app.services.money import from_cents
+from app.utils.json_provider import dumps
+
+CHUNK_SIZE = 1000
+
+CSV_FIELDS = ['id', 'date', 'description', 'amount', 'type', 'category_id', 'category', 'created_at']
+
+COLUMNS = Transaction.row_columns()
+
+
+def iter_rows(user_id, filters):
+    """Gera as linhas (apenas colunas, sem objetos ORM) em ordem (date, id)."""
+    query = aggregation.apply_filters(Transaction.query.with_entities(*COLUMNS), user_id, filters)
+    query = query.order_by(Transaction.date, Transaction.id).execution_options(yield_per=CHUNK_SIZE)
+    return iter(query)
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def row_to_dict(row):
+    """Mesmo formato de Transaction.to_dict(), a partir de uma linha de COLUMNS."""
+    category = category_registry.get(row.category_id)
+    return {
+        'id': row.id,
+        'description': row.description,
+        'amount': from_cents(row.cents),
+        'type': row.type,
+        'date': row.date,
+        'created_at': row.created_at,
+        'user_id': row.user_id,
+        'category_id': row.category_id,
+        'category': category.to_dict() if category else None
+    }
+
+
+def generate_ndjson(user_id, filters):
+    for chunk in _chunks(iter_rows(user_id, filters)):
+        yield ''.join(dumps(row_to_dict(row)) + '\n' for row in chunk)
+
+
+def generate_csv(user_id, filters):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+
+    for chunk in _chunks(iter_rows(user_id, filters)):
+        for row in chunk:
+            category = category_registry.get(row.category_id)
+            writer.writerow([
+                row.id,
+                row.date.strftime('%Y-%m-%d'),
+                row.description,
+                from_cents(row.cents),
+                row.type,
+                row.category_id,
+                category.name if category else '',
+                row.created_at.strftime('%Y-%m-%d %H:%M:%S') if row.created_at else ''
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Arquivo sem transações: enviar ao menos o cabeçalho
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,246 @@
+"""
+Importação em lote de transações a partir de CSV ou OFX.
+
+O arquivo é lido linha a linha (nunca inteiro em memória), cada registro é
+validado contra o registro de categorias e as linhas válidas são inseridas em
+lotes com um único INSERT de várias linhas, com commit a cada lote. O resumo
+mensal e a versão dos dados do usuário são atualizados uma vez por lote.
+
+Linhas inválidas são relatadas e puladas. Um arquivo malformado (CSV
+quebrado, texto ilegível) interrompe a leitura: o que veio antes é importado
+e o resultado indica a linha em que a leitura parou. Se um lote falhar no
+banco, ImportAborted traz quantas transações já tinham sido confirmadas,
+para o cliente não repetir a importação inteira e duplicar lançamentos.
+
+CSV: cabeçalho com date, description, amount e, opcionalmente, type e
+category_id ou category (nome). Sem type, o sinal do valor define o tipo.
+OFX: cada <STMTTRN> vira uma transação na categoria "Outros" do tipo
+correspondente ao sinal de TRNAMT.
+"""
+import csv
+import datetime
+import io
+import re
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models.transaction import Transaction
+from app.services import data_version, rollups
+from app.services.categories import category_registry
+from app.services.money import to_cents
+
+BATCH_SIZE = 1000
+
+# Limita o tamanho da resposta em arquivos com muitos erros
+MAX_REPORTED_ERRORS = 1000
+
+DEFAULT_CATEGORIES = {
+    'income': 'Outros (Receita)',
+    'expense': 'Outros (Despesa)'
+}
+
+OFX_TAG = re.compile(r'<(/?)([A-Z0-9.]+)>([^<\r\n]*)', re.IGNORECASE)
+
+
+class RowError(ValueError):
+    pass
+
+
+class ImportAborted(Exception):
+    """Falha no banco no meio da importação; result traz o que já foi confirmado."""
+
+    def __init__(self, message, result):
+        super().__init__(message)
+        self.result = result
+
+
+def open_text(binary_stream):
+    """Envolve um fluxo binário (upload ou corpo da requisição) para leitura de texto."""
+    if not isinstance(binary_stream, io.BufferedIOBase):
+        binary_stream = io.BufferedReader(binary_stream)
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', errors='replace', newline='')
+
+
+def parse_amount(value):
+    value = (value or '').strip().replace('R$', '').replace(' ', '')
+    if ',' in value:
+        # Formato brasileiro: 1.234,56
+        value = value.replace('.', '').replace(',', '.')
+    try:
+        # Decimal: o valor chega exato aos centavos, sem passar por float
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise RowError(f'Valor inválido: {value!r}')
+    # NaN e Infinity são aceitos por Decimal(), mas não são valores
+    if not amount.is_finite():
+        raise RowError(f'Valor inválido: {value!r}')
+    return amount
+
+
+def parse_date(value):
+    value = (value or '').strip()
+    # O OFX usa YYYYMMDD seguido de hora e fuso, que são descartados
+    for fmt, size in (('%Y-%m-%d', 10), ('%d/%m/%Y', 10), ('%Y%m%d', 8)):
+        try:
+            return datetime.datetime.strptime(value[:size], fmt).date()
+        except ValueError:
+            continue
+    raise RowError(f'Data inválida: {value!r}. Use YYYY-MM-DD')
+
+
+def iter_csv(text_stream):
+    """Gera (número da linha, dados) para cada registro do CSV."""
+    reader = csv.DictReader(text_stream)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_ofx(text_stream):
+    """
+    Gera (número da linha, dados) para cada <STMTTRN> do OFX.
+    Funciona tanto com o OFX 1.x (SGML, sem tags de fechamento) quanto com o 2.x (XML).
+    """
+    current = None
+    start_line = 0
+
+    for line_no, line in enumerate(text_stream, start=1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and current is not None:
+                    yield start_line, current
+                    current = None
+                elif not closing:
+                    current = {}
+                    start_line = line_no
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+    if current:
+        yield start_line, current
+
+
+def ofx_to_row(record):
+    amount = parse_amount(record.get('TRNAMT'))
+    type_ = 'income' if amount >= 0 else 'expense'
+    return {
+        'date': record.get('DTPOSTED', ''),
+        'description': record.get('MEMO') or record.get('NAME') or 'Transação importada',
+        'amount': amount,
+        'type': type_,
+        'category': DEFAULT_CATEGORIES[type_]
+    }
+
+
+def validate(row, user_id):
+    """Converte um registro em valores para o INSERT ou lança RowError."""
+    description = (row.get('description') or '').strip()
+    if not description:
+        raise RowError('Campo description é obrigatório')
+
+    amount = row.get('amount')
+    amount = amount if isinstance(amount, (int, float, Decimal)) else parse_amount(amount)
+
+    type_ = (row.get('type') or '').strip().lower() or ('income' if amount >= 0 else 'expense')
+    if type_ not in ('income', 'expense'):
+        raise RowError('Tipo de transação deve ser "income" ou "expense"')
+
+    if row.get('category_id'):
+        category = category_registry.get(row['category_id'])
+    elif row.get('category'):
+        category = category_registry.get_by_name(row['category'])
+    else:
+        category = category_registry.get_by_name(DEFAULT_CATEGORIES[type_])
+
+    if category is None:
+        raise RowError('Categoria não encontrada')
+    if category.type != type_:
+        raise RowError(f'Categoria incompatível com o tipo de transação. A categoria é do tipo {category.type}')
+
+    return {
+        'description': description[:200],
+        **Transaction.amount_values(to_cents(abs(amount))),
+        'type': type_,
+        'date': parse_date(row.get('date')),
+        'created_at': datetime.datetime.utcnow(),
+        'user_id': user_id,
+        'category_id': category.id
+    }
+
+
+def _flush_batch(user_id, batch):
+    db.session.execute(insert(Transaction), batch)
+
+    deltas = {}
+    for values in batch:
+        key = (values['date'].year, values['date'].month, values['category_id'], values['type'])
+        total, count = deltas.get(key, (0, 0))
+        deltas[key] = (total + values['amount_cents'], count + 1)
+
+    for (year, month, category_id, type_), (total, count) in deltas.items():
+        rollups.apply_delta(user_id, year, month, category_id, type_, total, count)
+
+    data_version.bump([user_id])
+    db.session.commit()
+
+
+def import_transactions(user_id, records, convert=None, batch_size=BATCH_SIZE):
+    """
+    Valida e insere os registros (pares (linha, dados) de iter_csv/iter_ofx).
+    convert, se informado, transforma cada registro antes da validação (ex.: ofx_to_row).
+    Cada lote é confirmado separadamente; um erro de linha não interrompe a importação.
+    """
+    user_id = int(user_id)
+    batch = []
+    imported = 0
+    failed = 0
+    errors = []
+    file_error = None
+    line = 0
+
+    def result():
+        return {
+            'imported': imported,
+            'failed': failed,
+            'errors': errors,
+            'errors_truncated': failed > len(errors),
+            'file_error': file_error
+        }
+
+    def flush():
+        try:
+            _flush_batch(user_id, batch)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise ImportAborted(f'Falha ao gravar o lote até a linha {line}: {e}', result()) from e
+
+    try:
+        for line, row in records:
+            try:
+                if convert is not None:
+                    row = convert(row)
+                batch.append(validate(row, user_id))
+            except RowError as e:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'line': line, 'error': str(e)})
+                continue
+
+            if len(batch) >= batch_size:
+                flush()
+                imported += len(batch)
+                batch = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        # Arquivo malformado: a leitura para aqui e o que veio antes é importado
+        file_error = {'line': line + 1, 'error': f'Arquivo inválido: {e}'}
+
+    if batch:
+        flush()
+        imported += len(batch)
+
+    return result()
@@ -0,0 +1,400 @@
+"""
+Ranking de usuários por XP.
+
+Mantém um índice ordenado (-xp, user_id) que responde em O(log n) o top-N, a
+posição de um usuário e os vizinhos dele no ranking, sem o COUNT(*) por
+requisição. Dois backends:
+
+- memory: skip list indexável no próprio processo. Cada worker tem a sua
+  cópia, ressincronizada a cada LEADERBOARD_REBUILD_INTERVAL segundos (60 por
+  padrão); entre uma e outra, workers diferentes podem discordar das posições.
+  A ressincronização é feita por uma requisição só, enquanto as demais seguem
+  respondendo com o índice atual até a troca.
+- redis: sorted set compartilhado (REDIS_URL), para que vários workers
+  concordem sobre as posições.
+
+As mudanças de XP são aplicadas depois do commit (ver os eventos no fim do
+arquivo); rebuild() recarrega tudo a partir da tabela de usuários.
+"""
+import logging
+import random
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+try:
+    import redis
+except ImportError:  # dependência opcional, só para o backend 'redis'
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+MAX_LEVEL = 32
+REDIS_KEY = 'pacpoupanca:leaderboard'
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, level):
+        self.key = key
+        self.next = [None] * level
+        self.width = [1] * level
+
+
+class IndexableSkipList:
+    """
+    Lista ordenada com inserção, remoção, posição (rank) e acesso por índice
+    em O(log n) esperado. Cada ponteiro guarda quantos elementos ele pula.
+    """
+
+    def __init__(self):
+        self.head = _Node(None, MAX_LEVEL)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def from_sorted(cls, keys):
+        """Constrói a lista em O(n) a partir de chaves já ordenadas e sem repetição."""
+        skiplist = cls()
+        last = [skiplist.head] * MAX_LEVEL
+        last_position = [0] * MAX_LEVEL
+        position = 0
+        for key in keys:
+            position += 1
+            node = _Node(key, skiplist._random_level())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_position[level]
+                last[level] = node
+                last_position[level] = position
+
+        # Ponteiros para o fim pulam até a posição size + 1, como em insert()
+        for level in range(MAX_LEVEL):
+            last[level].width[level] = position + 1 - last_position[level]
+        skiplist.size = position
+        return skiplist
+
+    def _random_level(self):
+        level = 1
+        while level < MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key):
+        chain = [None] * MAX_LEVEL
+        steps = [0] * MAX_LEVEL
+        node = self.head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        new_level = self._random_level()
+        new = _Node(key, new_level)
+        skipped = 0
+        for level in range(MAX_LEVEL):
+            prev = chain[level]
+            if level < new_level:
+                new.next[level] = prev.next[level]
+                prev.next[level] = new
+                new.width[level] = prev.width[level] - skipped
+                prev.width[level] = skipped + 1
+            else:
+                prev.width[level] += 1
+            skipped += steps[level]
+        self.size += 1
+
+    def remove(self, key):
+        chain = [None] * MAX_LEVEL
+        node = self.head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        for level in range(MAX_LEVEL):
+            prev = chain[level]
+            if prev.next[level] is target:
+                prev.width[level] += target.width[level] - 1
+                prev.next[level] = target.next[level]
+            else:
+                prev.width[level] -= 1
+        self.size -= 1
+
+    def count_less(self, key):
+        """Quantidade de elementos estritamente menores que key."""
+        count = 0
+        node = self.head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                count += node.width[level]
+                node = node.next[level]
+        return count
+
+    def _node_at(self, index):
+        node = self.head
+        index += 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.width[level] <= index:
+                index -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def slice(self, start, stop):
+        """Elementos nas posições [start, stop), começando em 0."""
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        if start >= stop:
+            return []
+
+        node = self._node_at(start)
+        keys = []
+        for _ in range(stop - start):
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class MemoryLeaderboard:
+    def __init__(self, rebuild_interval=0):
+        self.rebuild_interval = rebuild_interval
+        self._xp = {}
+        self._index = IndexableSkipList()
+        self._lock = threading.RLock()
+        self._built_at = None
+        # Mudanças aplicadas durante uma reconstrução, reaplicadas no índice novo
+        self._replay = None
+
+    def needs_rebuild(self):
+        return self._built_at is None
+
+    def is_stale(self):
+        return bool(self.rebuild_interval) and time.monotonic() - self._built_at > self.rebuild_interval
+
+    def rebuild(self, entries):
+        with self._lock:
+            self._replay = {}
+
+        try:
+            xp_by_user = {user_id: xp or 0 for user_id, xp in entries}
+            index = IndexableSkipList.from_sorted(sorted((-xp, user_id) for user_id, xp in xp_by_user.items()))
+        except BaseException:
+            with self._lock:
+                self._replay = None
+            raise
+
+        with self._lock:
+            replay, self._replay = self._replay, None
+            self._xp = xp_by_user
+            self._index = index
+            self._built_at = time.monotonic()
+            for user_id, xp in replay.items():
+                if xp is None:
+                    self.remove(user_id)
+                else:
+                    self.update(user_id, xp)
+
+    def update(self, user_id, xp):
+        xp = xp or 0
+        with self._lock:
+            if self._replay is not None:
+                self._replay[user_id] = xp
+            old = self._xp.get(user_id)
+            if old == xp:
+                return
+            if old is not None:
+                self._index.remove((-old, user_id))
+            self._xp[user_id] = xp
+            self._index.insert((-xp, user_id))
+
+    def remove(self, user_id):
+        with self._lock:
+            if self._replay is not None:
+                self._replay[user_id] = None
+            old = self._xp.pop(user_id, None)
+            if old is not None:
+                self._index.remove((-old, user_id))
+
+    def _position(self, xp):
+        # Empates dividem a mesma posição: 1 + quantos têm mais XP
+        return self._index.count_less((-xp, float('-inf'))) + 1
+
+    def _entries(self, keys):
+        return [(user_id, -neg_xp, self._position(-neg_xp)) for neg_xp, user_id in keys]
+
+    def top(self, n):
+        """Lista de (user_id, xp, posição) dos n primeiros."""
+        with self._lock:
+            return self._entries(self._index.slice(0, n))
+
+    def rank(self, user_id):
+        """Posição do usuário (1 = mais XP) ou None se não estiver no ranking."""
+        with self._lock:
+            xp = self._xp.get(user_id)
+            return None if xp is None else self._position(xp)
+
+    def around(self, user_id, radius):
+        """Usuários até radius posições acima e abaixo de user_id (inclusive ele)."""
+        with self._lock:
+            xp = self._xp.get(user_id)
+            if xp is None:
+                return []
+            index = self._index.count_less((-xp, user_id))
+            return self._entries(self._index.slice(index - radius, index + radius + 1))
+
+
+class RedisLeaderboard:
+    def __init__(self, url, key=REDIS_KEY):
+        if redis is None:
+            raise RuntimeError("LEADERBOARD_BACKEND=redis requer o pacote 'redis'")
+        self.client = redis.Redis.from_url(url)
+        self.key = key
+
+    def needs_rebuild(self):
+        return not self.client.exists(self.key)
+
+    def is_stale(self):
+        # O sorted set é atualizado a cada escrita e compartilhado pelos workers
+        return False
+
+    def rebuild(self, entries, chunk_size=10000):
+        tmp_key = f'{self.key}:rebuild'
+        pipe = self.client.pipeline()
+        pipe.delete(tmp_key)
+        chunk = {}
+        for user_id, xp in entries:
+            chunk[user_id] = xp or 0
+            if len(chunk) >= chunk_size:
+                pipe.zadd(tmp_key, chunk)
+                chunk = {}
+        if chunk:
+            pipe.zadd(tmp_key, chunk)
+        pipe.execute()
+
+        # Troca atômica: nenhum worker vê o ranking pela metade
+        if self.client.exists(tmp_key):
+            self.client.rename(tmp_key, self.key)
+        else:
+            self.client.delete(self.key)
+
+    def update(self, user_id, xp):
+        self.client.zadd(self.key, {user_id: xp or 0})
+
+    def remove(self, user_id):
+        self.client.zrem(self.key, user_id)
+
+    def _position(self, xp):
+        return self.client.zcount(self.key, f'({xp}', '+inf') + 1
+
+    def _entries(self, members):
+        return [(int(member), int(score), self._position(int(score))) for member, score in members]
+
+    def top(self, n):
+        return self._entries(self.client.zrevrange(self.key, 0, n - 1, withscores=True))
+
+    def rank(self, user_id):
+        xp = self.client.zscore(self.key, user_id)
+        return None if xp is None else self._position(int(xp))
+
+    def around(self, user_id, radius):
+        index = self.client.zrevrank(self.key, user_id)
+        if index is None:
+            return []
+        start = max(index - radius, 0)
+        return self._entries(self.client.zrevrange(self.key, start, index + radius, withscores=True))
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+
+def configure(app):
+    """Cria o backend configurado em LEADERBOARD_BACKEND ('memory' ou 'redis')."""
+    global _leaderboard
+
+    backend = app.config.get('LEADERBOARD_BACKEND', 'memory')
+    if backend == 'redis':
+        _leaderboard = RedisLeaderboard(app.config['REDIS_URL'])
+        return
+
+    interval = app.config.get('LEADERBOARD_REBUILD_INTERVAL', 0)
+    if not interval and app.config.get('WEB_CONCURRENCY', 1) > 1:
+        logger.warning(
+            "Ranking em memória com %s workers e LEADERBOARD_REBUILD_INTERVAL=0: as posições "
+            "vão divergir entre os workers. Use LEADERBOARD_BACKEND=redis ou um intervalo de "
+            "ressincronização.", app.config['WEB_CONCURRENCY'])
+    _leaderboard = MemoryLeaderboard(interval)
+
+
+def rebuild():
+    """Recarrega o ranking a partir da tabela de usuários."""
+    from app.extensions import db
+    from app.models.user import User
+
+    entries = db.session.query(User.id, User.xp).execution_options(yield_per=10000)
+    _leaderboard.rebuild((user_id, xp) for user_id, xp in entries)
+
+
+def get_leaderboard():
+    """Retorna o ranking, construindo-o a partir do banco no primeiro uso."""
+    if _leaderboard.needs_rebuild():
+        # Ainda não há o que servir: as requisições esperam a primeira carga
+        with _leaderboard_lock:
+            if _leaderboard.needs_rebuild():
+                rebuild()
+    elif _leaderboard.is_stale() and _leaderboard_lock.acquire(blocking=False):
+        # Ressincronização: só esta requisição reconstrói; as outras não esperam
+        try:
+            if _leaderboard.is_stale():
+                rebuild()
+        finally:
+            _leaderboard_lock.release()
+    return _leaderboard
+
+
+# Manter o ranking em dia: mudanças de XP (incluindo cadastro e exclusão de
+# usuários) são anotadas no flush e aplicadas só depois do commit
+@event.listens_for(Session, 'after_flush')
+def _collect_xp_changes(session, flush_context):
+    from app.models.user import User
+
+    pending = session.info.setdefault('leaderboard_pending', {})
+    for obj in session.new | session.dirty:
+        if isinstance(obj, User) and (obj in session.new or inspect(obj).attrs.xp.history.has_changes()):
+            pending[obj.id] = obj.xp
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            pending[obj.id] = None
+
+
+def schedule_update(session, user_id, xp):
+    """Para escritas feitas com SQL direto: aplica o novo XP após o commit."""
+    session.info.setdefault('leaderboard_pending', {})[int(user_id)] = xp
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_xp_changes(session):
+    pending = session.info.pop('leaderboard_pending', None)
+    if not pending or _leaderboard is None or _leaderboard.needs_rebuild():
+        return
+
+    for user_id, xp in pending.items():
+        if xp is None:
+            _leaderboard.remove(user_id)
+        else:
+            _leaderboard.update(user_id, xp)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_xp_changes(session):
+    session.info.pop('leaderboard_pending', None)
@@ -0,0 +1,60 @@
+"""
+Cálculo de nível a partir do XP.
+
+A curva é: o nível L vai de 100 * (L - 1)² até 100 * L² - 1 de XP. Então o
+nível é a raiz inteira de xp // 100 mais um, sem laço.
+"""
+import datetime
+import math
+
+from sqlalchemy import case, func, update
+
+# XP para passar do nível L para L + 1: XP_FACTOR * L²
+XP_FACTOR = 100
+
+
+def level_for_xp(xp):
+    return math.isqrt(max(xp or 0, 0) // XP_FACTOR) + 1
+
+
+def next_level_xp(level):
+    return XP_FACTOR * (level ** 2)
+
+
+def recalculate_all_levels(session):
+    """
+    Corrige o nível de todos os usuários com um único UPDATE, só nas linhas
+    que mudam (que também têm a versão dos dados incrementada). Os usuários
+    alterados saem do cache de usuários depois do commit.
+    Não faz commit. Retorna o número de usuários alterados.
+    """
+    from app.models.user import User
+    from app.services.user_cache import mark_changed
+
+    max_xp = session.query(func.max(User.xp)).scalar() or 0
+    max_level = level_for_xp(max_xp)
+
+    xp = func.coalesce(User.xp, 0)
+    new_level = case(
+        *[(xp < next_level_xp(level), level) for level in range(1, max_level)],
+        else_=max_level
+    )
+
+    stale = func.coalesce(User.level, 0) != new_level
+    # O UPDATE em massa não passa pelo ORM: os ids são lidos antes para invalidar o cache
+    changed_ids = [user_id for (user_id,) in session.query(User.id).filter(stale)]
+    if not changed_ids:
+        return 0
+
+    result = session.execute(
+        update(User)
+        .where(stale)
+        .values(
+            level=new_level,
+            data_version=User.data_version + 1,
+            data_updated_at=datetime.datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    mark_changed(session, changed_ids)
+    return result.rowcount
@@ -0,0 +1,189 @@
+"""
+Métricas por endpoint: tempo total, tempo no banco, número de instruções SQL,
+linhas retornadas e tamanho da resposta, expostas como histogramas no formato
+do Prometheus (ver app/api/metrics_routes.py).
+
+Cada thread grava no seu próprio shard, sem lock; os shards só são somados na
+hora da coleta (GET /metrics). O custo por requisição fica em algumas chamadas
+a perf_counter e bisect. Os shards de threads que já terminaram (o servidor de
+desenvolvimento cria uma por requisição) são somados a um acumulado e
+descartados, então o número de shards acompanha o de threads vivas.
+
+As linhas vêm de cursor.rowcount: drivers que não informam o total de um
+SELECT (ex.: SQLite, cursores em streaming) contam só as escritas.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# nome: (descrição, limites dos buckets)
+HISTOGRAMS = {
+    'http_request_duration_seconds': (
+        'Tempo total da requisição',
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)),
+    'http_request_db_seconds': (
+        'Tempo gasto em instruções SQL durante a requisição',
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)),
+    'http_request_db_statements': (
+        'Instruções SQL executadas na requisição',
+        (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)),
+    'http_request_db_rows': (
+        'Linhas retornadas ou afetadas pelas instruções SQL da requisição',
+        (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)),
+    'http_response_size_bytes': (
+        'Tamanho do corpo da resposta (respostas em streaming não entram)',
+        (100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000, 5000000)),
+}
+
+
+# thread -> séries do shard dela; _retired guarda a soma das threads encerradas
+_shards = {}
+_retired = {}
+_shards_lock = threading.Lock()
+
+
+def _merge(target, series):
+    for key, (counts, total) in list(series.items()):
+        current = target.get(key)
+        if current is None:
+            target[key] = (list(counts), total)
+        else:
+            target[key] = ([a + b for a, b in zip(current[0], counts)], current[1] + total)
+
+
+def _retire_dead_shards():
+    # Chamada com _shards_lock; uma thread encerrada não escreve mais no shard
+    for thread in [thread for thread in _shards if not thread.is_alive()]:
+        _merge(_retired, _shards.pop(thread))
+
+
+def _register_shard(series):
+    with _shards_lock:
+        _retire_dead_shards()
+        _shards[threading.current_thread()] = series
+
+
+class _Shard(threading.local):
+    # Estado da thread: histogramas acumulados e a requisição em andamento
+    def __init__(self):
+        self.series = {}
+        self.request = None
+        _register_shard(self.series)
+
+
+_local = _Shard()
+
+
+def observe(name, labels, value):
+    """Registra um valor no histograma (só a thread atual escreve no shard)."""
+    key = (name, labels)
+    entry = _local.series.get(key)
+    if entry is None:
+        entry = _local.series[key] = [[0] * (len(HISTOGRAMS[name][1]) + 1), 0.0]
+    entry[0][bisect_left(HISTOGRAMS[name][1], value)] += 1
+    entry[1] += value
+
+
+def collect():
+    """Soma os shards de todas as threads: {(nome, rótulos): (contagens, soma)}."""
+    with _shards_lock:
+        _retire_dead_shards()
+        shards = list(_shards.values())
+        merged = dict(_retired)
+
+    for series in shards:
+        _merge(merged, series)
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound):
+    return repr(float(bound)) if isinstance(bound, float) else str(bound)
+
+
+def render():
+    """Texto no formato de exposição do Prometheus."""
+    merged = collect()
+    lines = []
+
+    for name, (description, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} histogram')
+
+        for (metric, labels), (counts, total) in sorted(merged.items()):
+            if metric != name:
+                continue
+            label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label_text},le="{_format_bound(bound)}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{label_text}}} {total}')
+            lines.append(f'{name}_count{{{label_text}}} {cumulative}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _shards_lock:
+        _retired.clear()
+        for series in _shards.values():
+            series.clear()
+
+
+# -- Ciclo da requisição --
+
+def _before_request():
+    # [início, tempo no banco, instruções, linhas]
+    _local.request = [time.perf_counter(), 0.0, 0, 0]
+
+
+def _after_request(response):
+    current = _local.request
+    if current is None:
+        return response
+    _local.request = None
+
+    labels = (('endpoint', request.endpoint or 'desconhecido'), ('method', request.method))
+    observe('http_request_duration_seconds', labels, time.perf_counter() - current[0])
+    observe('http_request_db_seconds', labels, current[1])
+    observe('http_request_db_statements', labels, current[2])
+    observe('http_request_db_rows', labels, current[3])
+    if not response.is_streamed:
+        observe('http_response_size_bytes', labels, response.calculate_content_length() or 0)
+    return response
+
+
+# -- Eventos do SQLAlchemy (todas as engines, incluindo réplicas) --
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _local.request is not None:
+        conn.info['metrics_started'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = _local.request
+    started = conn.info.pop('metrics_started', None)
+    if current is None or started is None:
+        return
+    current[1] += time.perf_counter() - started
+    current[2] += 1
+    if cursor.rowcount > 0:
+        current[3] += cursor.rowcount
+
+
+def init_app(app):
+    """Liga a coleta ao ciclo de requisições do Flask."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
@@ -0,0 +1,109 @@
+"""
+Valores monetários em centavos (inteiros).
+
+O banco guarda transactions.amount_cents e monthly_summaries.total_cents;
+somas e agregados são feitos em inteiros, sem o erro acumulado do ponto
+flutuante. A API continua recebendo e devolvendo reais como número (12.34):
+to_cents() converte na entrada e from_cents() na saída.
+
+Migração (ver migrations/versions/0006_amount_cents.py):
+1. a migração cria as colunas em centavos; o código novo grava as duas
+   (centavos e a antiga coluna float 'amount');
+2. 'flask money backfill' preenche amount_cents das linhas antigas em lotes,
+   com a aplicação no ar; enquanto isso as leituras usam
+   Transaction.cents, que recorre à coluna antiga quando falta o valor;
+3. quando 'flask money status' indicar zero pendências, uma migração futura
+   pode tornar amount_cents obrigatória e remover a coluna float.
+"""
+import time
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from sqlalchemy import BigInteger, Float, cast, func, literal, select, update
+
+CENTS_PER_UNIT = 100
+
+
+def to_cents(value):
+    """Converte reais (float, str, int ou Decimal) em centavos, arredondando meio centavo para cima."""
+    if value is None:
+        return None
+    try:
+        amount = value if isinstance(value, Decimal) else Decimal(str(value))
+        return int((amount * CENTS_PER_UNIT).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f'Valor inválido: {value!r}')
+
+
+def from_cents(cents):
+    """Centavos em reais para a resposta JSON (o float mais próximo do valor exato)."""
+    if cents is None:
+        return None
+    return int(cents) / CENTS_PER_UNIT
+
+
+def legacy_to_cents(column):
+    """Expressão SQL que converte a antiga coluna float em centavos."""
+    return cast(func.round(column * CENTS_PER_UNIT), BigInteger)
+
+
+def legacy_value_to_cents(value):
+    """
+    Centavos de um valor da antiga coluna float, calculados pelo banco com a
+    mesma expressão de legacy_to_cents(). to_cents() arredondaria o texto do
+    float (0.285 -> 29, enquanto ROUND(28.4999...) dá 28), e empates exatos
+    como 0.125 são arredondados de forma diferente em cada banco (SQLite para
+    longe do zero, MySQL e PostgreSQL para o par): os agregados mantidos em
+    Python divergiriam dos recalculados em SQL. Só as linhas ainda não
+    convertidas pelo backfill passam por aqui.
+    """
+    from app.extensions import db
+
+    if value is None:
+        return None
+    return db.session.scalar(select(legacy_to_cents(literal(value, Float()))))
+
+
+def pending_backfill():
+    """Quantas transações ainda não têm amount_cents."""
+    from app.extensions import db
+    from app.models.transaction import Transaction
+
+    return db.session.query(func.count(Transaction.id)).filter(Transaction.amount_cents.is_(None)).scalar()
+
+
+def backfill_amount_cents(batch_size=5000, pause=0.0, progress=None):
+    """
+    Preenche amount_cents a partir da coluna antiga, em faixas de id com um
+    commit por lote, para não segurar bloqueios com a aplicação no ar.
+    Linhas já preenchidas (novas ou editadas) não são tocadas.
+    Retorna o número de linhas atualizadas.
+    """
+    from app.extensions import db
+    from app.models.transaction import Transaction
+
+    table = Transaction.__table__
+    low, high = db.session.query(func.min(table.c.id), func.max(table.c.id)).filter(
+        table.c.amount_cents.is_(None)
+    ).one()
+    if low is None:
+        return 0
+
+    updated = 0
+    start = low - 1
+    while start < high:
+        end = start + batch_size
+        result = db.session.execute(
+            update(table)
+            .where(table.c.id > start, table.c.id <= end, table.c.amount_cents.is_(None))
+            .values(amount_cents=legacy_to_cents(table.c.amount))
+        )
+        db.session.commit()
+        updated += result.rowcount
+        start = end
+
+        if progress is not None:
+            progress(updated, min(end, high))
+        if pause:
+            time.sleep(pause)
+
+    return updated
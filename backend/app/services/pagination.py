@@ -0,0 +1,62 @@
+"""
+Paginação por cursor (keyset) sobre (date, id).
+
+O cursor é opaco para o cliente: base64 de [data, id] da última transação da
+página. A próxima página começa logo depois dessa chave, então o custo de
+qualquer página é o mesmo da primeira e transações com a mesma data mantêm
+uma ordem estável pelo id.
+"""
+import base64
+import datetime
+import json
+
+from sqlalchemy import and_, or_
+
+from app.models.transaction import Transaction
+
+
+def encode_cursor(transaction):
+    raw = json.dumps([transaction.date.isoformat(), transaction.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Retorna (data, id) ou lança ValueError se o cursor for inválido."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_str, transaction_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.date.fromisoformat(date_str), int(transaction_id)
+    except (TypeError, ValueError, json.JSONDecodeError):
+        raise ValueError('Cursor inválido')
+
+
+def order_newest_first(query):
+    return query.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+
+def after_cursor(query, cursor):
+    """Restringe a consulta às transações depois do cursor, em ordem decrescente."""
+    date, transaction_id = decode_cursor(cursor)
+    return query.filter(or_(
+        Transaction.date < date,
+        and_(Transaction.date == date, Transaction.id < transaction_id)
+    ))
+
+
+def fetch_page(query, limit, cursor=None):
+    """
+    Retorna (transações, próximo cursor) da consulta já filtrada.
+    O próximo cursor é None quando não há mais páginas.
+    """
+    if cursor:
+        query = after_cursor(query, cursor)
+
+    if limit <= 0:
+        return [], None
+
+    rows = order_newest_first(query).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+
+    return rows, None
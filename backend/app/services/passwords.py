@@ -0,0 +1,115 @@
+"""
+Hash e verificação de senhas fora da thread da requisição.
+
+O trabalho de hash (CPU intensivo) roda em um pool de processos limitado, com
+um teto de requisições esperando na fila: acima dele, ou quando o hash passa
+de PASSWORD_HASH_TIMEOUT segundos, HashingBusy é lançada e a API responde 503
+em vez de travar todas as outras rotas do worker.
+
+Os parâmetros vêm da configuração (PASSWORD_HASH_METHOD, no formato do
+werkzeug, ex.: 'scrypt:32768:8:1' ou 'pbkdf2:sha256:600000'). Hashes gravados
+com parâmetros antigos são refeitos no próximo login bem-sucedido
+(ver needs_rehash).
+"""
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingBusy(Exception):
+    """Fila de hash cheia ou hash demorando demais; o cliente deve tentar novamente."""
+
+
+def _generate(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def _check(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    def __init__(self, method='scrypt', salt_length=16, workers=0, max_queue=64, timeout=10):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self._method_id = None
+
+    @property
+    def method_id(self):
+        # Forma canônica do método (o werkzeug completa os parâmetros padrão)
+        if self._method_id is None:
+            self._method_id = _generate('', self.method, self.salt_length).split('$', 1)[0]
+        return self._method_id
+
+    def _get_executor(self):
+        # Um pool por processo: workers criados por fork não herdam o do pai
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._executor_lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    # Importado aqui: multiprocessing só é carregado no primeiro hash
+                    from concurrent.futures import ProcessPoolExecutor
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # A vaga só é liberada quando o hash termina, mesmo que o cliente desista antes
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Pool sobrecarregado: mesma resposta da fila cheia (503 com Retry-After)
+            future.cancel()
+            raise HashingBusy()
+
+    def hash(self, password):
+        return self._run(_generate, password, self.method, self.salt_length)
+
+    def verify(self, password_hash, password):
+        return self._run(_check, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        return (password_hash or '').split('$', 1)[0] != self.method_id
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+def configure(app):
+    global password_hasher
+
+    password_hasher.shutdown()
+    password_hasher = PasswordHasher(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        salt_length=app.config['PASSWORD_HASH_SALT_LENGTH'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_queue=app.config['PASSWORD_HASH_MAX_QUEUE'],
+        timeout=app.config['PASSWORD_HASH_TIMEOUT']
+    )
+
+
+def get_hasher():
+    return password_hasher
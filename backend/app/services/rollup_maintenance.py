@@ -0,0 +1,103 @@
+"""
+Verificação e reconstrução do resumo mensal (flask rollups verify/rebuild).
+
+Separado de rollups.py, que roda a cada escrita, para que os workers da API
+não carreguem código que só os comandos de manutenção usam.
+"""
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models.summary import MonthlySummary
+from app.models.transaction import Transaction
+from app.services.money import from_cents
+
+
+def _expected_rows(user_id=None):
+    """Recalcula o agregado diretamente da tabela de transações."""
+    year = func.extract('year', Transaction.date)
+    month = func.extract('month', Transaction.date)
+    query = db.session.query(
+        Transaction.user_id,
+        year,
+        month,
+        Transaction.category_id,
+        Transaction.type,
+        func.sum(Transaction.cents),
+        func.count(Transaction.id)
+    )
+
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+
+    rows = query.group_by(
+        Transaction.user_id, year, month, Transaction.category_id, Transaction.type
+    ).all()
+
+    return {
+        (int(r[0]), int(r[1]), int(r[2]), int(r[3]), r[4]): (int(r[5] or 0), int(r[6]))
+        for r in rows
+    }
+
+
+def _stored_rows(user_id=None):
+    query = MonthlySummary.query
+    if user_id is not None:
+        query = query.filter_by(user_id=user_id)
+
+    return {
+        (s.user_id, s.year, s.month, s.category_id, s.type): (s.total_cents, s.count)
+        for s in query.all()
+        if s.count
+    }
+
+
+def verify(user_id=None):
+    """
+    Compara o agregado com os valores recalculados a partir das transações.
+    Retorna a lista de divergências encontradas (vazia se estiver consistente).
+    """
+    expected = _expected_rows(user_id)
+    stored = _stored_rows(user_id)
+    drift = []
+
+    for key in sorted(set(expected) | set(stored), key=str):
+        exp_total, exp_count = expected.get(key, (0, 0))
+        got_total, got_count = stored.get(key, (0, 0))
+        if exp_count != got_count or exp_total != got_total:
+            user, year, month, category_id, type_ = key
+            drift.append({
+                'user_id': user,
+                'year': year,
+                'month': month,
+                'category_id': category_id,
+                'type': type_,
+                'expected_total': from_cents(exp_total),
+                'stored_total': from_cents(got_total),
+                'expected_count': exp_count,
+                'stored_count': got_count
+            })
+
+    return drift
+
+
+def rebuild(user_id=None):
+    """
+    Apaga e recria o agregado a partir das transações.
+    Não faz commit; quem chama decide quando confirmar.
+    Retorna o número de linhas geradas.
+    """
+    delete = MonthlySummary.query
+    if user_id is not None:
+        delete = delete.filter_by(user_id=user_id)
+    delete.delete(synchronize_session=False)
+
+    expected = _expected_rows(user_id)
+    db.session.add_all([
+        MonthlySummary(
+            user_id=user, year=year, month=month, category_id=category_id,
+            type=type_, total_cents=total, total=from_cents(total), count=count
+        )
+        for (user, year, month, category_id, type_), (total, count) in expected.items()
+    ])
+
+    return len(expected)
@@ -0,0 +1,109 @@
+"""
+Manutenção incremental da tabela monthly_summaries.
+
+Cada criação, edição ou exclusão de transação aplica um delta (valor em
+centavos e quantidade) na linha de (usuário, ano, mês, categoria, tipo)
+correspondente, dentro da mesma transação de banco da alteração. Assim o
+commit da rota grava a transação e o agregado juntos. Por serem inteiros, os
+totais batem exatamente com a soma das transações.
+
+Verificação e reconstrução completas ficam em rollup_maintenance.py, que só
+é importado pelos comandos 'flask rollups'.
+"""
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.summary import MonthlySummary
+from app.models.transaction import TransactionCategory
+from app.services.money import from_cents
+
+
+def apply_delta(user_id, year, month, category_id, type_, cents, count):
+    """Soma valor (em centavos) e quantidade à linha do agregado, criando-a se necessário."""
+    key = and_(
+        MonthlySummary.user_id == user_id,
+        MonthlySummary.year == year,
+        MonthlySummary.month == month,
+        MonthlySummary.category_id == category_id,
+        MonthlySummary.type == type_
+    )
+    stmt = update(MonthlySummary).where(key).values(
+        total_cents=MonthlySummary.total_cents + cents,
+        total=MonthlySummary.total + from_cents(cents),
+        count=MonthlySummary.count + count
+    )
+
+    if db.session.execute(stmt).rowcount:
+        return
+
+    # Primeira transação do mês nessa categoria: criar a linha. Se outra
+    # requisição criar a mesma linha em paralelo, a restrição única falha e
+    # repetimos o UPDATE.
+    try:
+        with db.session.begin_nested():
+            db.session.add(MonthlySummary(
+                user_id=user_id,
+                year=year,
+                month=month,
+                category_id=category_id,
+                type=type_,
+                total_cents=cents,
+                total=from_cents(cents),
+                count=count
+            ))
+    except IntegrityError:
+        db.session.execute(stmt)
+
+
+def snapshot(transaction):
+    """
+    Captura os campos que definem a contribuição de uma transação no agregado.
+    Use antes de alterar a transação para depois chamar unrecord().
+    """
+    return {
+        'user_id': int(transaction.user_id),
+        'date': transaction.date,
+        'category_id': int(transaction.category_id),
+        'type': transaction.type,
+        'cents': transaction.cents
+    }
+
+
+def record(transaction):
+    """Soma uma transação nova (ou o novo estado de uma editada) ao agregado."""
+    data = snapshot(transaction)
+    apply_delta(data['user_id'], data['date'].year, data['date'].month,
+                 data['category_id'], data['type'], data['cents'], 1)
+
+
+def unrecord(data):
+    """Remove do agregado a contribuição capturada por snapshot()."""
+    apply_delta(data['user_id'], data['date'].year, data['date'].month,
+                 data['category_id'], data['type'], -data['cents'], -1)
+
+
+def totals_by_category(user_id, since=None):
+    """
+    Retorna (tipo, nome da categoria, total em centavos) a partir do agregado,
+    para todo o histórico ou a partir de um mês (since=(ano, mês)) em diante.
+    """
+    query = db.session.query(
+        MonthlySummary.type,
+        TransactionCategory.name,
+        func.sum(MonthlySummary.total_cents)
+    ).join(
+        TransactionCategory, TransactionCategory.id == MonthlySummary.category_id
+    ).filter(
+        MonthlySummary.user_id == user_id,
+        MonthlySummary.count > 0
+    )
+
+    if since is not None:
+        year, month = since
+        query = query.filter(or_(
+            MonthlySummary.year > year,
+            and_(MonthlySummary.year == year, MonthlySummary.month >= month)
+        ))
+
+    return query.group_by(MonthlySummary.type, TransactionCategory.name).all()
@@ -0,0 +1,222 @@
+"""
+Geração de dados sintéticos em volume (flask seed).
+
+Cria usuários com renda e nível de atividade variados, históricos de
+transações com sazonalidade por categoria (material escolar em
+janeiro/fevereiro, compras na Black Friday e no Natal, 13º salário etc.) e XP
+com distribuição de cauda longa. Tudo sai de um gerador com semente fixa: a
+mesma semente produz os mesmos dados.
+
+As inserções são em lote (executemany) com commit por lote de usuários, e o
+resumo mensal é calculado durante a geração e inserido junto, em vez de
+reconstruído no fim. Todos os usuários gerados têm a mesma senha.
+"""
+import calendar
+import datetime
+import math
+import random
+import time
+
+from sqlalchemy import func, insert
+
+from app.extensions import db
+from app.models.summary import MonthlySummary
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.categories import category_registry
+from app.services.levels import level_for_xp
+from app.services.money import from_cents
+from app.services.passwords import get_hasher
+
+FLAT = (1.0,) * 12
+
+# categoria: (lançamentos por mês, valor mediano, sazonalidade jan..dez)
+CATEGORY_PROFILES = {
+    'Alimentação': (12, 60, (1.0, 0.95, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.05, 1.3)),
+    'Moradia': (3, 450, FLAT),
+    'Transporte': (6, 80, (1.3, 1.0, 1.0, 1.0, 1.0, 1.0, 1.3, 1.0, 1.0, 1.0, 1.0, 1.4)),
+    'Lazer': (3, 90, (1.5, 1.4, 1.0, 0.9, 0.9, 1.0, 1.4, 1.0, 0.9, 1.0, 1.0, 1.6)),
+    'Saúde': (1.5, 150, (1.0, 1.0, 1.0, 1.1, 1.2, 1.3, 1.3, 1.2, 1.0, 1.0, 1.0, 0.9)),
+    'Educação': (1, 250, (2.5, 2.0, 1.0, 0.8, 0.8, 0.8, 1.3, 1.2, 0.8, 0.8, 0.8, 0.6)),
+    'Compras': (2, 180, (1.1, 0.8, 0.9, 0.9, 1.1, 1.0, 0.9, 0.9, 0.9, 1.0, 1.8, 2.2)),
+    'Assinaturas': (2, 40, FLAT),
+    'Outros (Despesa)': (1, 70, FLAT),
+    'Investimentos': (0.5, 300, FLAT),
+    'Presentes': (0.1, 200, (0.8, 0.6, 0.6, 0.6, 1.5, 0.6, 0.6, 1.0, 0.6, 1.0, 0.8, 4.0)),
+    'Outros (Receita)': (0.3, 250, FLAT),
+}
+DEFAULT_PROFILE = (0.5, 100, FLAT)
+
+SALARY_CATEGORY = 'Salário'
+MEDIAN_SALARY = 3000
+MAX_XP = 500000
+
+# Acima disso math.exp(-lam) chega a 0 e o algoritmo de Knuth não para
+POISSON_STEP = 500
+
+
+def _poisson(rng, lam):
+    # Algoritmo de Knuth; taxas grandes (--per-month alto) são somadas em
+    # partes, já que Poisson(a) + Poisson(b) = Poisson(a + b)
+    count = 0
+    while lam > POISSON_STEP:
+        count += _poisson(rng, POISSON_STEP)
+        lam -= POISSON_STEP
+    if lam <= 0:
+        return count
+    limit = math.exp(-lam)
+    product = rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def _month_range(months, today):
+    """(ano, mês, último dia utilizável) dos últimos `months` meses, do mais antigo ao atual."""
+    year, month = today.year, today.month
+    result = []
+    for _ in range(months):
+        last_day = today.day if (year, month) == (today.year, today.month) else calendar.monthrange(year, month)[1]
+        result.append((year, month, last_day))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return result[::-1]
+
+
+class Seeder:
+    def __init__(self, users, months=24, per_month=30, seed=42, batch_size=10000,
+                 prefix='seed', password='seed123', progress=None):
+        self.users = users
+        self.months = months
+        self.per_month = per_month
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.password = password
+        self.progress = progress or (lambda message: None)
+
+        # Mesma referência de 'hoje' do resto da API (UTC)
+        self.today = datetime.datetime.utcnow().date()
+        self.calendar = _month_range(months, self.today)
+
+        categories = category_registry.all()
+        self.salary = next((c for c in categories if c.name == SALARY_CATEGORY), None)
+        self.profiles = [
+            (category, *CATEGORY_PROFILES.get(category.name, DEFAULT_PROFILE))
+            for category in categories if category is not self.salary
+        ]
+        # Ajusta as taxas para que a média mensal fique em torno de per_month
+        base_rate = sum(rate for _, rate, _, _ in self.profiles) or 1
+        self.rate_scale = max(per_month - (1 if self.salary else 0), 0) / base_rate
+
+        self.stats = {'users': 0, 'transactions': 0, 'summaries': 0}
+
+    # -- Usuários --
+
+    def _user_rows(self, start, count, password_hash):
+        now = datetime.datetime.utcnow()
+        rows = []
+        for index in range(start, start + count):
+            xp = min(int(self.rng.paretovariate(1.2) * 100) - 100, MAX_XP)
+            signup_days = self.rng.randrange(self.months * 30 + 1)
+            rows.append({
+                'username': f'{self.prefix}{index}',
+                'password_hash': password_hash,
+                'email': f'{self.prefix}{index}@example.com',
+                'phone': f'(11) 9{self.rng.randrange(10**7, 10**8)}',
+                'full_name': f'Usuário sintético {index}',
+                'birth_date': datetime.date(self.rng.randint(1950, 2006), self.rng.randint(1, 12), self.rng.randint(1, 28)),
+                'created_at': now - datetime.timedelta(days=signup_days),
+                'xp': xp,
+                'level': level_for_xp(xp),
+                'last_xp_grant': self.today - datetime.timedelta(days=self.rng.randrange(30)) if xp else None,
+                'data_version': 0
+            })
+        return rows
+
+    # -- Transações --
+
+    def _user_transactions(self, user_id, summaries):
+        rng = self.rng
+        income_factor = rng.lognormvariate(0, 0.6)
+        activity = rng.lognormvariate(0, 0.4) * self.rate_scale
+        salary = round(MEDIAN_SALARY * income_factor, 2)
+        now = datetime.datetime.utcnow()
+
+        def add(year, month, day, category, amount):
+            cents = round(amount * 100)
+            key = (user_id, year, month, category.id, category.type)
+            total = summaries.get(key)
+            summaries[key] = (cents, 1) if total is None else (total[0] + cents, total[1] + 1)
+            return {
+                'description': category.name,
+                **Transaction.amount_values(cents),
+                'type': category.type,
+                'date': datetime.date(year, month, day),
+                'created_at': now,
+                'user_id': user_id,
+                'category_id': category.id
+            }
+
+        for year, month, last_day in self.calendar:
+            if self.salary and last_day >= 5:
+                yield add(year, month, 5, self.salary, salary)
+                # 13º salário em duas parcelas
+                if month in (11, 12):
+                    yield add(year, month, min(20, last_day), self.salary, salary / 2)
+
+            for category, rate, median, season in self.profiles:
+                for _ in range(_poisson(rng, rate * season[month - 1] * activity)):
+                    amount = rng.lognormvariate(math.log(median * income_factor), 0.5)
+                    yield add(year, month, rng.randint(1, last_day), category, amount)
+
+    def _insert(self, model, rows):
+        if rows:
+            db.session.execute(insert(model), rows)
+
+    # -- Execução --
+
+    def run(self, users_per_commit=1000):
+        """Gera tudo e retorna as contagens {'users', 'transactions', 'summaries'}."""
+        password_hash = get_hasher().hash(self.password)
+        start = db.session.query(func.count(User.id)).filter(User.username.like(f'{self.prefix}%')).scalar()
+        started = time.perf_counter()
+
+        for offset in range(0, self.users, users_per_commit):
+            count = min(users_per_commit, self.users - offset)
+            rows = self._user_rows(start + offset, count, password_hash)
+            self._insert(User, rows)
+            # Pelos nomes gerados: um cadastro real feito durante a carga não entra
+            usernames = [row['username'] for row in rows]
+            user_ids = [user_id for (user_id,) in
+                        db.session.query(User.id).filter(User.username.in_(usernames)).order_by(User.id)]
+
+            summaries = {}
+            batch = []
+            for user_id in user_ids:
+                for row in self._user_transactions(user_id, summaries):
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        self._insert(Transaction, batch)
+                        self.stats['transactions'] += len(batch)
+                        batch = []
+            self._insert(Transaction, batch)
+            self.stats['transactions'] += len(batch)
+
+            self._insert(MonthlySummary, [
+                {'user_id': user_id, 'year': year, 'month': month, 'category_id': category_id,
+                 'type': type_, 'total_cents': total, 'total': from_cents(total), 'count': n}
+                for (user_id, year, month, category_id, type_), (total, n) in summaries.items()
+            ])
+            self.stats['summaries'] += len(summaries)
+            self.stats['users'] += len(user_ids)
+
+            db.session.commit()
+            elapsed = time.perf_counter() - started
+            self.progress(f"{self.stats['users']}/{self.users} usuários, "
+                          f"{self.stats['transactions']} transações "
+                          f"({self.stats['transactions'] / elapsed:.0f}/s)")
+
+        return self.stats
@@ -0,0 +1,71 @@
+"""
+Cache de curta duração do usuário autenticado (identity map entre requisições).
+
+Guarda cópias destacadas (detached) dos usuários por USER_CACHE_TTL segundos.
+Em um acerto, a cópia é ligada à sessão da requisição com merge(load=False),
+sem consulta ao banco. Qualquer commit que altere o usuário (perfil, XP,
+transações que mudam a versão dos dados, exclusão) invalida a entrada neste
+worker; nos demais, a entrada expira pelo TTL. Com TTL 0 o cache fica
+desligado e resta só o carregamento único por requisição (app/utils/auth.py).
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+
+class UserCache:
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        if not self.ttl:
+            return None
+        entry = self._entries.get(int(user_id))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, user):
+        if not self.ttl:
+            return
+        from app.models.user import User
+
+        copy = User(**{attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs})
+        make_transient_to_detached(copy)
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, copy)
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(int(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def mark_changed(session, user_ids):
+    """Agenda a invalidação dos usuários para depois do commit da sessão."""
+    session.info.setdefault('changed_users', set()).update(
+        int(user_id) for user_id in user_ids if user_id is not None
+    )
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    changed = session.info.pop('changed_users', None)
+    if changed:
+        user_cache.invalidate(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_users', None)
@@ -1,7 +1,32 @@
 from functools import wraps
-from flask import jsonify, request
+from flask import g, jsonify, request
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from app.extensions import db
 from app.models.user import User
+from app.services.db_routing import using_replica
+from app.services.user_cache import user_cache
+
+def get_current_user():
+    """
+    Retorna o usuário autenticado (ou None), carregado no máximo uma vez por
+    requisição e compartilhado entre decoradores e rotas.
+    Deve ser usado após o decorador jwt_required().
+    """
+    if 'current_user' not in g:
+        g.current_user = load_user(get_jwt_identity())
+    return g.current_user
+
+def load_user(user_id):
+    """Busca o usuário pela chave primária, usando o cache de curta duração se ativo."""
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return db.session.merge(cached, load=False)
+    
+    user = db.session.get(User, int(user_id))
+    # Cópias lidas de uma réplica podem estar atrasadas: não vão para o cache
+    if user is not None and not using_replica():
+        user_cache.put(user)
+    return user
 
 def admin_required(fn):
     """
@@ -11,8 +36,7 @@ def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         # Aqui você pode implementar sua lógica para verificar se o usuário é admin
         # Por exemplo, verificar um campo is_admin no modelo User
@@ -0,0 +1,168 @@
+"""
+Compressão das respostas (gzip, ou brotli quando o pacote está instalado).
+
+O algoritmo é negociado pelo Accept-Encoding. Só respostas de tipos textuais
+com pelo menos COMPRESS_MIN_SIZE bytes são comprimidas; abaixo disso o custo
+de CPU não compensa. Respostas em streaming (exportação) são comprimidas bloco
+a bloco, com flush a cada bloco, sem juntar o corpo na memória.
+
+Rotas com o decorador precompressed() (ex.: /categories) guardam o corpo já
+comprimido em memória, por versão dos dados, e o reaproveitam enquanto a
+versão não muda.
+"""
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, request
+
+try:
+    import brotli
+except ImportError:  # dependência opcional
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'text/'
+)
+
+# Corpos pré-comprimidos são poucos e pequenos; vale o nível máximo
+PRECOMPRESSED_GZIP_LEVEL = 9
+PRECOMPRESSED_BROTLI_QUALITY = 11
+PRECOMPRESSED_MAX_ENTRIES = 64
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding():
+    """Melhor codificação aceita pelo cliente, ou None."""
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compressor(encoding, level):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.flush, compressor.finish
+    # wbits=31: formato gzip (cabeçalho e CRC), como gzip.compress()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def compress_stream(chunks, encoding, level):
+    """Comprime um iterável de blocos, entregando cada bloco assim que chega."""
+    process, flush, finish = _compressor(encoding, level)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = process(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+class PrecompressedCache:
+    def __init__(self, max_entries=PRECOMPRESSED_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, key, data, encoding):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+
+        level = PRECOMPRESSED_BROTLI_QUALITY if encoding == 'br' else PRECOMPRESSED_GZIP_LEVEL
+        body = compress(data, encoding, level)
+        with self._lock:
+            self._entries[key] = body
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+precompressed_cache = PrecompressedCache()
+
+
+def precompressed(version_fn):
+    """
+    Decorador para rotas GET que raramente mudam: o corpo comprimido fica em
+    cache por (versão, URL, codificação). version_fn é a mesma função usada
+    por conditional() e retorna (versão, última alteração).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            g.precompressed_version = version_fn()[0]
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _is_compressible(response):
+    mimetype = response.mimetype or ''
+    return any(mimetype.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def _compress_response(response):
+    config = current_app.config
+    if (not config['COMPRESS_ENABLED']
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or not _is_compressible(response)):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding()
+    if encoding is None or request.method == 'HEAD':
+        return response
+
+    level = config['COMPRESS_BROTLI_QUALITY'] if encoding == 'br' else config['COMPRESS_LEVEL']
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, level)
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    data = response.get_data()
+    if len(data) < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    version = g.get('precompressed_version')
+    if version is not None and response.status_code == 200:
+        body = precompressed_cache.get_or_compress((version, request.full_path, encoding), data, encoding)
+    else:
+        body = compress(data, encoding, level)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    app.after_request(_compress_response)
@@ -0,0 +1,99 @@
+"""
+GET condicional (ETag / Last-Modified) para as rotas de leitura.
+
+O ETag é derivado de uma versão barata de obter (por padrão a versão dos dados
+do usuário autenticado) e da URL pedida. Se o cliente já tem a versão atual,
+a resposta 304 é devolvida antes de executar a rota, ou seja, sem consultas
+de agregação e sem serialização.
+"""
+import datetime
+import hashlib
+from functools import wraps
+
+from flask import make_response, request
+
+
+def user_data_version():
+    """Retorna (versão, última alteração) do usuário autenticado, ou None."""
+    from app.utils.auth import get_current_user
+
+    # Mesmo carregamento que a rota vai usar depois, se não for 304
+    user = get_current_user()
+    if user is None:
+        return None
+    return f'u{user.id}.{user.data_version}', user.data_updated_at
+
+
+def user_data_version_on(*dates):
+    """
+    Versão dos dados do usuário para rotas cujo corpo depende da data atual
+    (período corrente, janela que termina hoje). As datas resolvidas entram na
+    versão: na virada do período o ETag muda mesmo sem novas escritas.
+    """
+    current = user_data_version()
+    dates = [date for date in dates if date is not None]
+    if current is None or not dates:
+        return current
+
+    version, last_modified = current
+    # A virada do período também conta como alteração para If-Modified-Since
+    today = datetime.datetime.utcnow().date()
+    changed_at = datetime.datetime.combine(min(max(dates), today), datetime.time())
+    if last_modified is None or last_modified < changed_at:
+        last_modified = changed_at
+    return f"{version}.{'.'.join(date.isoformat() for date in dates)}", last_modified
+
+
+def category_version():
+    from app.services.categories import category_registry
+
+    return f'c{category_registry.version}', None
+
+
+def make_etag(version):
+    # A URL completa entra no ETag: filtros diferentes geram corpos diferentes
+    digest = hashlib.sha1(f'{version}|{request.full_path}'.encode()).hexdigest()[:20]
+    return f'{version}-{digest}'
+
+
+def is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def conditional(version_fn=user_data_version):
+    """
+    Decorador para rotas GET que responde 304 quando os dados não mudaram.
+    Deve ser usado após o decorador jwt_required().
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            current = version_fn()
+            if current is None:
+                # Deixa a rota tratar o caso (ex.: usuário não encontrado)
+                return fn(*args, **kwargs)
+
+            version, last_modified = current
+            etag = make_etag(version)
+
+            if is_not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # O navegador pode guardar a resposta, mas deve revalidar sempre
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return wrapper
+
+    return decorator
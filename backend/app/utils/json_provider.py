@@ -0,0 +1,85 @@
+"""
+Serialização JSON das respostas.
+
+Usa o orjson quando ele está instalado (dependência opcional) e o módulo json
+da biblioteca padrão caso contrário; JSON_BACKEND=json força o segundo. Os
+dois produzem o mesmo conteúdo: datas e horários são codificados aqui, no
+formato que a API sempre usou ('2024-01-31' e '2024-01-31 13:45:00'), então
+os modelos devolvem date/datetime sem chamar strftime linha a linha.
+"""
+import datetime
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+BACKENDS = ('auto', 'orjson', 'json')
+
+
+def default(obj):
+    # datetime antes de date: datetime é subclasse de date
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat(sep=' ', timespec='seconds')
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+def _orjson_options(indent=False):
+    # Datas passam por default() para manter o formato da API (orjson usaria 'T')
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if indent:
+        options |= orjson.OPT_INDENT_2
+    return options
+
+
+def dumps(obj):
+    """Serializa com o backend mais rápido disponível (usado fora de respostas, ex.: exportação)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=_orjson_options()).decode()
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':'))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    ensure_ascii = False
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None
+
+    def configure(self, backend):
+        if backend not in BACKENDS:
+            raise ValueError(f"JSON_BACKEND inválido: {backend!r} (use {', '.join(BACKENDS)})")
+        if backend == 'orjson' and orjson is None:
+            raise RuntimeError("JSON_BACKEND=orjson requer o pacote 'orjson'")
+        self.use_orjson = orjson is not None and backend != 'json'
+
+    def _indent(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def dumps(self, obj, **kwargs):
+        # Argumentos extras (indent, cls...) só existem no módulo json
+        if self.use_orjson and not kwargs:
+            return orjson.dumps(obj, default=default, option=_orjson_options()).decode()
+        kwargs.setdefault('default', default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if not self.use_orjson:
+            return super().response(obj)
+        # Bytes direto para a resposta, sem passar por str
+        body = orjson.dumps(obj, default=default, option=_orjson_options(self._indent()))
+        return self._app.response_class(body, mimetype=self.mimetype)
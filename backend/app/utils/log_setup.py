@@ -0,0 +1,81 @@
+"""
+Configuração única de logs da aplicação.
+
+O logger raiz recebe só um QueueHandler: a requisição apenas enfileira o
+registro, e a formatação e a escrita (stderr) acontecem na thread do
+QueueListener. Mensagens devem usar formatação preguiçosa
+(logger.info('... %s', valor)), para que níveis desligados não custem nada.
+
+Nível padrão por ambiente (APP_ENV, ou FLASK_ENV): development=DEBUG,
+testing=WARNING, production=INFO. LOG_LEVEL substitui o padrão e LOG_LEVELS
+ajusta loggers específicos, ex.: LOG_LEVELS=werkzeug=WARNING,app.api=DEBUG
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+DEFAULT_LEVELS = {
+    'development': 'DEBUG',
+    'testing': 'WARNING',
+    'production': 'INFO',
+}
+
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+_listener = None
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # A fila é do próprio processo: não é preciso formatar o registro antes de
+    # enfileirar (o padrão do QueueHandler, pensado para filas entre processos)
+    def prepare(self, record):
+        return record
+
+
+def default_level(environment):
+    return DEFAULT_LEVELS.get(environment, 'INFO')
+
+
+def parse_levels(value):
+    """Lê 'logger=NIVEL,logger=NIVEL' em um dicionário."""
+    levels = {}
+    for item in (value or '').split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(app):
+    """Liga o logger raiz à fila e inicia a thread que escreve os logs."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    root.setLevel(app.config['LOG_LEVEL'])
+
+    for name, level in app.config['LOG_LEVELS'].items():
+        logging.getLogger(name).setLevel(level)
+
+
+def _stop_listener():
+    # Esvazia a fila ao encerrar o processo
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
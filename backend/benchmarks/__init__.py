@@ -0,0 +1,13 @@
+"""
+Benchmarks da API e dos caminhos internos mais usados.
+
+Monta a aplicação sobre um SQLite temporário, popula usuários e transações e
+mede latência (p50/p95/p99) e vazão de cada endpoint, além de
+micro-benchmarks (Transaction.to_dict, agregações). O resultado vai para um
+arquivo JSON; o modo compare aponta regressões entre dois resultados.
+
+Uso (a partir do diretório backend):
+    python -m benchmarks run --users 200 --transactions 500 --output antes.json
+    python -m benchmarks run --output depois.json
+    python -m benchmarks compare antes.json depois.json --threshold 10
+"""
@@ -0,0 +1,111 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    from benchmarks.environment import build_app, seed
+    from benchmarks.scenarios import run_all
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='pacpoupanca-bench-'), 'bench.db')
+    app = build_app(db_path)
+
+    print(f"Populando {args.users} usuários x {args.transactions} transações em {db_path}...")
+    user_id, username = seed(app, args.users, args.transactions, seed=args.seed)
+
+    results = run_all(app, user_id, username, args.iterations, args.login_iterations,
+                      args.warmup, only=args.only)
+
+    for name, stats in results.items():
+        print(f"{name:45} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+              f"p99 {stats['p99_ms']:9.3f} ms  {stats['throughput_per_s']:10.1f}/s")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'users': args.users,
+            'transactions_per_user': args.transactions,
+            'iterations': args.iterations,
+            'login_iterations': args.login_iterations,
+            'warmup': args.warmup,
+            'seed': args.seed
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+    print(f"Resultados gravados em {args.output}")
+    return 0
+
+
+def compare(args):
+    from benchmarks.stats import compare as compare_results
+
+    with open(args.baseline) as baseline_file, open(args.current) as current_file:
+        baseline = json.load(baseline_file)
+        current = json.load(current_file)
+
+    rows = compare_results(baseline, current, metric=args.metric, threshold=args.threshold)
+    print(f"{baseline['meta'].get('commit')} -> {current['meta'].get('commit')} ({args.metric})")
+
+    regressions = 0
+    for name, before, after, change, regressed in rows:
+        mark = 'REGRESSÃO' if regressed else ''
+        regressions += regressed
+        print(f"{name:45} {before:9.3f} -> {after:9.3f} ms  {change:+7.1f}%  {mark}")
+
+    if regressions:
+        print(f"{regressions} benchmark(s) acima do limite de {args.threshold}%.")
+        return 1
+    print("Nenhuma regressão acima do limite.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmarks da API.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Popula um SQLite temporário e mede os cenários.')
+    run_parser.add_argument('--users', type=int, default=200)
+    run_parser.add_argument('--transactions', type=int, default=500, help='Transações por usuário')
+    run_parser.add_argument('--iterations', type=int, default=200)
+    run_parser.add_argument('--login-iterations', type=int, default=20,
+                            help='O login é dominado pelo hash de senha; menos repetições')
+    run_parser.add_argument('--warmup', type=int, default=5)
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--only', help='Mede só os cenários cujo nome contém este texto')
+    run_parser.add_argument('--db', help='Arquivo SQLite (padrão: diretório temporário)')
+    run_parser.add_argument('--output', default='benchmark-results.json')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help='Compara dois arquivos de resultado.')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--metric', default='p50_ms',
+                                choices=['mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'])
+    compare_parser.add_argument('--threshold', type=float, default=10.0,
+                                help='Variação percentual considerada regressão')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Aplicação de benchmark sobre SQLite e carga de dados sintéticos."""
+import datetime
+import os
+import random
+
+BENCH_PASSWORD = 'senha-de-benchmark'
+BATCH_SIZE = 10000
+
+
+def build_app(db_path):
+    """Cria a aplicação apontando para um arquivo SQLite novo."""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    from app import create_app
+    from app.services.bootstrap import bootstrap_database
+
+    app = create_app(bootstrap=False)
+    with app.app_context():
+        bootstrap_database()
+    return app
+
+
+def seed(app, users, transactions_per_user, seed=42, days=365):
+    """
+    Insere usuários (todos com a senha BENCH_PASSWORD) e transações espalhadas
+    pelos últimos `days` dias, e reconstrói o agregado mensal e o ranking.
+    Retorna o id e o nome do primeiro usuário, usado nas medições.
+    """
+    from sqlalchemy import insert
+
+    from app.extensions import db
+    from app.models.transaction import Transaction
+    from app.models.user import User
+    from app.services import leaderboard, rollup_maintenance
+    from app.services.categories import category_registry
+    from app.services.levels import level_for_xp
+    from app.services.passwords import get_hasher
+
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    today = now.date()
+
+    with app.app_context():
+        password_hash = get_hasher().hash(BENCH_PASSWORD)
+
+        user_rows = []
+        for index in range(users):
+            xp = rng.randint(0, 20000)
+            user_rows.append({
+                'username': f'bench{index}',
+                'password_hash': password_hash,
+                'email': f'bench{index}@example.com',
+                'phone': '(00) 00000-0000',
+                'full_name': f'Usuário de benchmark {index}',
+                'birth_date': datetime.date(1990, 1, 1),
+                'created_at': now,
+                'xp': xp,
+                'level': level_for_xp(xp),
+                'data_version': 0
+            })
+        db.session.execute(insert(User), user_rows)
+
+        user_ids = [user_id for (user_id,) in db.session.query(User.id).filter(User.username.like('bench%'))]
+        categories = category_registry.all()
+
+        batch = []
+        for user_id in user_ids:
+            for _ in range(transactions_per_user):
+                category = rng.choice(categories)
+                batch.append({
+                    'description': f'{category.name} #{rng.randint(1, 9999)}',
+                    **Transaction.amount_values(rng.randint(500, 200000)),
+                    'type': category.type,
+                    'date': today - datetime.timedelta(days=rng.randrange(days)),
+                    'created_at': now,
+                    'user_id': user_id,
+                    'category_id': category.id
+                })
+                if len(batch) >= BATCH_SIZE:
+                    db.session.execute(insert(Transaction), batch)
+                    batch = []
+        if batch:
+            db.session.execute(insert(Transaction), batch)
+
+        rollup_maintenance.rebuild()
+        db.session.commit()
+        leaderboard.rebuild()
+
+        first = db.session.get(User, user_ids[0])
+        return first.id, first.username
@@ -0,0 +1,84 @@
+"""Cenários medidos: endpoints HTTP (pelo test client) e micro-benchmarks."""
+import datetime
+
+from benchmarks.environment import BENCH_PASSWORD
+from benchmarks.stats import measure
+
+
+def _request(client, method, url, headers=None, json=None):
+    def call():
+        response = client.open(url, method=method, headers=headers, json=json)
+        if response.status_code != 200:
+            raise RuntimeError(f'{method} {url}: status {response.status_code}')
+        response.get_data()
+    return call
+
+
+def http_scenarios(app, username, iterations, login_iterations):
+    """Retorna {nome: (função, iterações)} para os endpoints da API."""
+    client = app.test_client()
+
+    login = client.post('/api/login', json={'username': username, 'password': BENCH_PASSWORD})
+    if login.status_code != 200:
+        raise RuntimeError(f'Login de benchmark falhou: status {login.status_code}')
+    headers = {'Authorization': f"Bearer {login.get_json()['access_token']}"}
+
+    start_date = (datetime.date.today() - datetime.timedelta(days=90)).isoformat()
+    credentials = {'username': username, 'password': BENCH_PASSWORD}
+
+    scenarios = {
+        'http.login': (_request(client, 'POST', '/api/login', json=credentials), login_iterations),
+        'http.transactions': (_request(client, 'GET', '/api/transactions', headers), iterations),
+        'http.transactions_filtered': (_request(
+            client, 'GET', f'/api/transactions?type=expense&start_date={start_date}', headers), iterations),
+        'http.rankings': (_request(client, 'GET', '/api/rankings', headers), iterations),
+        'http.profile_with_transactions': (_request(
+            client, 'GET', '/api/profile?include_transactions=true', headers), iterations),
+    }
+    for period in ('all', 'month', 'week'):
+        scenarios[f'http.summary_{period}'] = (
+            _request(client, 'GET', f'/api/summary?period={period}', headers), iterations)
+
+    return scenarios
+
+
+def micro_scenarios(app, user_id, iterations, batch_size=500):
+    """Retorna {nome: (função, iterações)} para os caminhos internos (dentro de um app context)."""
+    from app.models.transaction import Transaction
+    from app.services import aggregation, rollups
+
+    transactions = Transaction.query.filter_by(user_id=user_id).limit(batch_size).all()
+    filters = aggregation.parse_filters({'type': 'expense'})
+
+    scenarios = {
+        f'micro.transaction_to_dict_x{len(transactions)}': (
+            lambda: [transaction.to_dict() for transaction in transactions], iterations),
+        'micro.aggregation_totals_by_category': (
+            lambda: aggregation.totals_by_category(user_id), iterations),
+        'micro.aggregation_summarize_filtered': (
+            lambda: aggregation.summarize(user_id, filters), iterations),
+        'micro.rollups_totals_by_category': (
+            lambda: rollups.totals_by_category(user_id), iterations),
+    }
+    for period in ('all', 'month', 'week'):
+        scenarios[f'micro.summarize_period_{period}'] = (
+            lambda period=period: aggregation.summarize_period(user_id, period), iterations)
+
+    return scenarios
+
+
+def run_all(app, user_id, username, iterations, login_iterations, warmup, only=None):
+    results = {}
+
+    for name, (fn, count) in http_scenarios(app, username, iterations, login_iterations).items():
+        if only and only not in name:
+            continue
+        results[name] = measure(fn, count, warmup)
+
+    with app.app_context():
+        for name, (fn, count) in micro_scenarios(app, user_id, iterations).items():
+            if only and only not in name:
+                continue
+            results[name] = measure(fn, count, warmup)
+
+    return results
@@ -0,0 +1,59 @@
+"""Medição, percentis e comparação de resultados."""
+import math
+import time
+
+
+def percentile(sorted_samples, p):
+    """Percentil pelo método nearest-rank (amostras já ordenadas)."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples, elapsed):
+    ordered = sorted(samples)
+    to_ms = 1000.0
+    return {
+        'n': len(samples),
+        'mean_ms': sum(samples) / len(samples) * to_ms,
+        'min_ms': ordered[0] * to_ms,
+        'p50_ms': percentile(ordered, 50) * to_ms,
+        'p95_ms': percentile(ordered, 95) * to_ms,
+        'p99_ms': percentile(ordered, 99) * to_ms,
+        'max_ms': ordered[-1] * to_ms,
+        'throughput_per_s': len(samples) / elapsed if elapsed else 0.0
+    }
+
+
+def measure(fn, iterations, warmup=0):
+    """Executa fn `warmup` vezes sem medir e depois `iterations` vezes medindo."""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def compare(baseline, current, metric='p50_ms', threshold=10.0):
+    """
+    Compara dois resultados (o conteúdo dos arquivos JSON).
+    Retorna [(nome, antes, depois, variação %, regrediu)] para os benchmarks
+    presentes nos dois, em ordem de nome.
+    """
+    rows = []
+    before_results = baseline['results']
+    after_results = current['results']
+
+    for name in sorted(set(before_results) & set(after_results)):
+        before = before_results[name][metric]
+        after = after_results[name][metric]
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append((name, before, after, change, change > threshold))
+
+    return rows
@@ -0,0 +1,35 @@
+"""
+Funções auxiliares para escrever migrações idempotentes.
+Cada migração recebe uma conexão SQLAlchemy já dentro de uma transação.
+"""
+from sqlalchemy import inspect, text
+
+
+def has_table(connection, table):
+    return inspect(connection).has_table(table)
+
+
+def has_column(connection, table, column):
+    return any(c['name'] == column for c in inspect(connection).get_columns(table))
+
+
+def has_index(connection, table, name):
+    return any(ix['name'] == name for ix in inspect(connection).get_indexes(table))
+
+
+def add_column(connection, table, column, ddl):
+    """Adiciona a coluna com a definição SQL informada, se ainda não existir."""
+    if has_column(connection, table, column):
+        print(f"  Coluna '{table}.{column}' já existe.")
+        return
+    connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+    print(f"  Coluna '{table}.{column}' adicionada.")
+
+
+def create_index(connection, name, table, columns):
+    """Cria o índice sobre as colunas informadas, se ainda não existir."""
+    if has_index(connection, table, name):
+        print(f"  Índice '{name}' já existe.")
+        return
+    connection.execute(text(f'CREATE INDEX {name} ON {table} ({", ".join(columns)})'))
+    print(f"  Índice '{name}' criado.")
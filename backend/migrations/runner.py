@@ -0,0 +1,138 @@
+"""
+Executor de migrações versionadas.
+
+As migrações ficam em migrations/versions/NNNN_nome.py e expõem uma função
+upgrade(connection). As versões aplicadas são registradas na tabela
+schema_migrations, então cada migração roda uma única vez por banco.
+
+Uso (a partir do diretório backend):
+    python -m migrations.runner upgrade   # aplica as migrações pendentes
+    python -m migrations.runner status    # lista aplicadas e pendentes
+    python -m migrations.runner check     # falha se faltar algum índice dos modelos
+"""
+import argparse
+import datetime
+import importlib
+import os
+import sys
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select
+
+VERSIONS_DIR = os.path.join(os.path.dirname(__file__), 'versions')
+
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', String(20), primary_key=True),
+    Column('name', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+def discover():
+    """Retorna [(versão, nome, módulo)] ordenado pela versão."""
+    migrations = []
+    for filename in sorted(os.listdir(VERSIONS_DIR)):
+        if not filename.endswith('.py') or filename.startswith('_'):
+            continue
+        module_name = filename[:-3]
+        version, _, name = module_name.partition('_')
+        module = importlib.import_module(f'migrations.versions.{module_name}')
+        migrations.append((version, name, module))
+    return migrations
+
+
+def applied_versions(connection):
+    schema_migrations.create(connection, checkfirst=True)
+    return {row.version for row in connection.execute(select(schema_migrations.c.version))}
+
+
+def upgrade(engine):
+    """Aplica as migrações pendentes, cada uma em sua própria transação."""
+    with engine.begin() as connection:
+        applied = applied_versions(connection)
+
+    pending = [m for m in discover() if m[0] not in applied]
+    if not pending:
+        print("Nenhuma migração pendente.")
+        return []
+
+    for version, name, module in pending:
+        print(f"Aplicando {version}_{name}...")
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=version,
+                name=name,
+                applied_at=datetime.datetime.utcnow()
+            ))
+
+    print(f"{len(pending)} migração(ões) aplicada(s).")
+    return [version for version, _, _ in pending]
+
+
+def status(engine):
+    with engine.begin() as connection:
+        applied = applied_versions(connection)
+
+    for version, name, _ in discover():
+        mark = 'aplicada' if version in applied else 'pendente'
+        print(f"{version}_{name}: {mark}")
+
+
+def missing_indexes(engine, metadata):
+    """
+    Compara os índices declarados nos modelos com os do banco.
+    Retorna [(tabela, índice, colunas)] dos índices ausentes ou com colunas diferentes.
+    """
+    inspector = inspect(engine)
+    missing = []
+
+    for table in metadata.sorted_tables:
+        expected = {ix.name: [c.name for c in ix.columns] for ix in table.indexes}
+        if not expected:
+            continue
+
+        live = {}
+        if inspector.has_table(table.name):
+            live = {ix['name']: ix['column_names'] for ix in inspector.get_indexes(table.name)}
+
+        for name, columns in sorted(expected.items()):
+            if live.get(name) != columns:
+                missing.append((table.name, name, columns))
+
+    return missing
+
+
+def check(engine, metadata):
+    missing = missing_indexes(engine, metadata)
+    if not missing:
+        print("Todos os índices esperados pelos modelos existem no banco.")
+        return True
+
+    for table, name, columns in missing:
+        print(f"Índice ausente: {table}.{name} ({', '.join(columns)})")
+    print("Execute 'python -m migrations.runner upgrade'.")
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Migrações do banco de dados do Pac Poupança.')
+    parser.add_argument('command', choices=['upgrade', 'status', 'check'])
+    args = parser.parse_args(argv)
+
+    from app import create_app, db
+
+    # Sem bootstrap: create_all() criaria as tabelas no formato atual antes das migrações
+    app = create_app(bootstrap=False, cli=False)
+    with app.app_context():
+        if args.command == 'upgrade':
+            upgrade(db.engine)
+        elif args.command == 'status':
+            status(db.engine)
+        elif not check(db.engine, db.metadata):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
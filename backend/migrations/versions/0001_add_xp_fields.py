@@ -0,0 +1,10 @@
+"""
+Adiciona os campos de XP à tabela de usuários.
+"""
+from migrations.helpers import add_column
+
+
+def upgrade(connection):
+    add_column(connection, 'users', 'xp', 'INT DEFAULT 0')
+    add_column(connection, 'users', 'level', 'INT DEFAULT 1')
+    add_column(connection, 'users', 'last_xp_grant', 'DATE DEFAULT NULL')
@@ -0,0 +1,62 @@
+"""
+Cria a tabela monthly_summaries (resumo mensal por usuário e categoria) e a
+preenche a partir das transações existentes. create_app() pode já ter criado
+a tabela vazia com db.create_all(), então o preenchimento só depende de ela
+estar vazia.
+
+As tabelas são descritas aqui como eram nesta versão, sem importar os modelos
+da aplicação: mudanças posteriores nos modelos não alteram esta migração.
+"""
+import datetime
+
+from sqlalchemy import (Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table,
+                        UniqueConstraint, column, func, insert, select, table)
+
+from migrations.helpers import has_table
+
+metadata = MetaData()
+
+# Só para resolver as chaves estrangeiras; estas tabelas não são criadas aqui
+Table('users', metadata, Column('id', Integer, primary_key=True))
+Table('transaction_categories', metadata, Column('id', Integer, primary_key=True))
+
+monthly_summaries = Table(
+    'monthly_summaries', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+    Column('year', Integer, nullable=False),
+    Column('month', Integer, nullable=False),
+    Column('category_id', Integer, ForeignKey('transaction_categories.id'), nullable=False),
+    Column('type', String(20), nullable=False),
+    Column('total', Float, nullable=False, default=0),
+    Column('count', Integer, nullable=False, default=0),
+    Column('updated_at', DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow),
+    UniqueConstraint('user_id', 'year', 'month', 'category_id', 'type', name='uq_monthly_summary_key')
+)
+
+transactions = table(
+    'transactions',
+    column('id'), column('user_id'), column('category_id'), column('type'), column('date'), column('amount')
+)
+
+
+def upgrade(connection):
+    if not has_table(connection, 'monthly_summaries'):
+        monthly_summaries.create(connection)
+        print("  Tabela 'monthly_summaries' criada.")
+
+    if connection.execute(select(func.count()).select_from(monthly_summaries)).scalar():
+        print("  Tabela 'monthly_summaries' já preenchida.")
+        return
+
+    t = transactions.c
+    year = func.extract('year', t.date)
+    month = func.extract('month', t.date)
+    rows = select(
+        t.user_id, year, month, t.category_id, t.type, func.sum(t.amount), func.count(t.id)
+    ).group_by(t.user_id, year, month, t.category_id, t.type)
+
+    connection.execute(insert(monthly_summaries).from_select(
+        ['user_id', 'year', 'month', 'category_id', 'type', 'total', 'count'], rows
+    ))
+    print("  Tabela 'monthly_summaries' preenchida a partir das transações.")
@@ -0,0 +1,12 @@
+"""
+Índices compostos para as consultas de transações: sempre por usuário e
+intervalo de datas, com filtros opcionais de categoria e tipo. O id no
+primeiro índice cobre a ordenação (date, id) da paginação por cursor.
+"""
+from migrations.helpers import create_index
+
+
+def upgrade(connection):
+    create_index(connection, 'ix_transactions_user_date_id', 'transactions', ['user_id', 'date', 'id'])
+    create_index(connection, 'ix_transactions_user_category_date', 'transactions', ['user_id', 'category_id', 'date'])
+    create_index(connection, 'ix_transactions_user_type_date', 'transactions', ['user_id', 'type', 'date'])
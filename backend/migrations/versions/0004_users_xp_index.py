@@ -0,0 +1,8 @@
+"""
+Índice em users.xp, usado pela ordenação e contagem do ranking.
+"""
+from migrations.helpers import create_index
+
+
+def upgrade(connection):
+    create_index(connection, 'ix_users_xp', 'users', ['xp'])
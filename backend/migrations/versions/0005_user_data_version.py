@@ -0,0 +1,10 @@
+"""
+Adiciona a versão dos dados do usuário, usada nos ETags/Last-Modified das
+rotas de leitura.
+"""
+from migrations.helpers import add_column
+
+
+def upgrade(connection):
+    add_column(connection, 'users', 'data_version', 'INT NOT NULL DEFAULT 0')
+    add_column(connection, 'users', 'data_updated_at', 'DATETIME DEFAULT NULL')
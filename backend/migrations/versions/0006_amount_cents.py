@@ -0,0 +1,26 @@
+"""
+Valores em centavos (inteiros): transactions.amount_cents e
+monthly_summaries.total_cents.
+
+A coluna das transações é criada vazia (NULL) e preenchida depois, em lotes
+e com a aplicação no ar, por 'flask money backfill'; até lá as leituras usam
+a antiga coluna float para as linhas pendentes. Os totais do resumo mensal
+são convertidos aqui mesmo (a tabela é pequena); 'flask rollups verify'
+confere o resultado contra as transações.
+"""
+from sqlalchemy import BigInteger, cast, column, func, table, update
+
+from migrations.helpers import add_column
+
+
+def upgrade(connection):
+    add_column(connection, 'transactions', 'amount_cents', 'BIGINT NULL')
+    add_column(connection, 'monthly_summaries', 'total_cents', 'BIGINT NOT NULL DEFAULT 0')
+
+    summaries = table('monthly_summaries', column('total'), column('total_cents'))
+    result = connection.execute(
+        update(summaries)
+        .where(summaries.c.total_cents == 0, summaries.c.total != 0)
+        .values(total_cents=cast(func.round(summaries.c.total * 100), BigInteger))
+    )
+    print(f"  {result.rowcount} total(is) do resumo mensal convertido(s) para centavos.")
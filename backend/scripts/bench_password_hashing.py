@@ -0,0 +1,71 @@
+"""
+Benchmark de verificação de senha (o custo dominante do /login).
+
+Mede verificações por segundo com os parâmetros informados: na própria thread
+(1 núcleo) e pelo pool de processos com várias threads de requisição
+simultâneas, e reporta logins por segundo por núcleo.
+
+Uso (a partir do diretório backend):
+    python -m scripts.bench_password_hashing --method scrypt --workers 4 --seconds 5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from app.services.passwords import PasswordHasher
+
+
+def measure(hasher, password_hash, password, threads, seconds):
+    count = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        nonlocal count
+        done = 0
+        while time.perf_counter() < deadline:
+            hasher.verify(password_hash, password)
+            done += 1
+        with lock:
+            count += done
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return count / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de hash de senhas (logins por segundo por núcleo).')
+    parser.add_argument('--method', default=os.getenv('PASSWORD_HASH_METHOD', 'scrypt'))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args(argv)
+
+    password = 'senha-de-benchmark'
+
+    inline = PasswordHasher(method=args.method, workers=0)
+    password_hash = inline.hash(password)
+    print(f"Método: {inline.method_id}")
+
+    rate = measure(inline, password_hash, password, threads=1, seconds=args.seconds)
+    print(f"Na thread da requisição: {rate:.1f} logins/s (1 núcleo)")
+
+    pooled = PasswordHasher(method=args.method, workers=args.workers, max_queue=args.workers * 4)
+    try:
+        pooled.verify(password_hash, password)  # inicia os processos antes de medir
+        rate = measure(pooled, password_hash, password, threads=args.workers * 2, seconds=args.seconds)
+    finally:
+        pooled.shutdown()
+    print(f"Pool com {args.workers} processo(s): {rate:.1f} logins/s, "
+          f"{rate / args.workers:.1f} logins/s por núcleo")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
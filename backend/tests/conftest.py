@@ -0,0 +1,109 @@
+"""
+Fixtures compartilhadas: aplicação contra um banco SQLite temporário, um
+usuário com token de acesso e um relógio controlável para as rotas que
+dependem da data de hoje.
+"""
+import datetime
+import types
+
+import pytest
+
+PASSWORD = 'senha-de-teste'
+
+# Módulos cuja noção de 'agora' (datetime.datetime.utcnow) o relógio controla,
+# incluindo o carimbo de data_updated_at das escritas
+CLOCK_MODULES = (
+    'app.services.aggregation',
+    'app.services.cashflow',
+    'app.services.data_version',
+    'app.utils.http_cache'
+)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv('PASSWORD_HASH_WORKERS', '0')
+    monkeypatch.setenv('LOG_LEVEL', 'WARNING')
+
+    from app import create_app
+    from app.services.bootstrap import bootstrap_database
+
+    app = create_app(bootstrap=False)
+    with app.app_context():
+        bootstrap_database()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id(app):
+    from app.extensions import db
+    from app.models.user import User
+
+    with app.app_context():
+        user = User(
+            username='teste',
+            email='teste@example.com',
+            phone='(00) 00000-0000',
+            full_name='Usuário de teste',
+            birth_date=datetime.date(2000, 1, 1)
+        )
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def auth(app, user_id):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def category_ids(app):
+    """IDs das categorias padrão por nome."""
+    from app.services.categories import category_registry
+
+    with app.app_context():
+        return {category.name: category.id for category in category_registry.all()}
+
+
+class Clock:
+    """Relógio em UTC; set() muda o instante visto pelos módulos de CLOCK_MODULES."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def set(self, now):
+        self.now = now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import importlib
+
+    clock = Clock(datetime.datetime(2024, 1, 10, 12, 0))
+
+    class FrozenDatetime(datetime.datetime):
+        @classmethod
+        def utcnow(cls):
+            return clock.now
+
+    fake = types.SimpleNamespace(
+        datetime=FrozenDatetime,
+        date=datetime.date,
+        time=datetime.time,
+        timedelta=datetime.timedelta
+    )
+    for name in CLOCK_MODULES:
+        monkeypatch.setattr(importlib.import_module(name), 'datetime', fake)
+    return clock
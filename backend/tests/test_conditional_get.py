@@ -0,0 +1,87 @@
+"""
+GET condicional (ETag / 304) nas rotas que dependem da data de hoje: na
+virada do período a resposta muda mesmo sem novas escritas, e uma
+revalidação com o ETag antigo não pode receber 304.
+"""
+import datetime
+
+
+def add_transaction(client, auth, category_id, amount, date, type_='expense'):
+    response = client.post('/api/transactions', headers=auth, json={
+        'description': 'Teste', 'amount': amount, 'type': type_,
+        'category_id': category_id, 'date': date
+    })
+    assert response.status_code == 201
+
+
+def revalidate(client, auth, url, etag):
+    return client.get(url, headers={**auth, 'If-None-Match': etag})
+
+
+def test_summary_etag_changes_when_the_week_rolls_over(client, auth, clock, category_ids):
+    # Quarta-feira, 10/01/2024
+    add_transaction(client, auth, category_ids['Alimentação'], 10, '2024-01-09')
+
+    first = client.get('/api/summary?period=week', headers=auth)
+    assert first.get_json()['expenses'] == 10.0
+    assert revalidate(client, auth, '/api/summary?period=week', first.headers['ETag']).status_code == 304
+
+    clock.set(datetime.datetime(2024, 1, 20, 12, 0))
+    later = revalidate(client, auth, '/api/summary?period=week', first.headers['ETag'])
+    assert later.status_code == 200
+    assert later.get_json()['expenses'] == 0.0
+    assert later.headers['ETag'] != first.headers['ETag']
+
+
+def test_summary_if_modified_since_sees_the_month_rollover(client, auth, clock, category_ids):
+    add_transaction(client, auth, category_ids['Alimentação'], 10, '2024-01-09')
+    first = client.get('/api/summary?period=month', headers=auth)
+
+    clock.set(datetime.datetime(2024, 2, 1, 0, 30))
+    later = client.get('/api/summary?period=month',
+                       headers={**auth, 'If-Modified-Since': first.headers['Last-Modified']})
+    assert later.status_code == 200
+    assert later.get_json()['expenses'] == 0.0
+
+
+def test_cashflow_etag_follows_the_default_window(client, auth, clock, category_ids):
+    add_transaction(client, auth, category_ids['Alimentação'], 10, '2024-01-10')
+
+    first = client.get('/api/cashflow?interval=day', headers=auth)
+    assert first.get_json()['end_date'] == '2024-01-10'
+    assert revalidate(client, auth, '/api/cashflow?interval=day', first.headers['ETag']).status_code == 304
+
+    # Depois da meia-noite (UTC) a janela anda um dia
+    clock.set(datetime.datetime(2024, 1, 11, 0, 5))
+    later = revalidate(client, auth, '/api/cashflow?interval=day', first.headers['ETag'])
+    assert later.status_code == 200
+    assert later.get_json()['end_date'] == '2024-01-11'
+
+    # Com a janela explícita, o ETag não depende do dia
+    url = '/api/cashflow?interval=day&start_date=2024-01-01&end_date=2024-01-10'
+    fixed = client.get(url, headers=auth)
+    clock.set(datetime.datetime(2024, 1, 12, 0, 5))
+    assert revalidate(client, auth, url, fixed.headers['ETag']).status_code == 304
+
+
+def test_cashflow_rejects_an_invalid_category_id(client, auth, clock):
+    response = client.get('/api/cashflow?category_id=abc', headers=auth)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'category_id inválido'
+
+
+def test_dashboard_summary_is_not_reused_across_months(client, auth, clock, category_ids):
+    add_transaction(client, auth, category_ids['Alimentação'], 10, '2024-01-09')
+
+    first = client.get('/api/dashboard', headers=auth)
+    payload = first.get_json()
+    assert payload['summary']['expenses'] == 10.0
+    known = ','.join(f'{section}:{etag}' for section, etag in payload['etags'].items())
+
+    clock.set(datetime.datetime(2024, 2, 1, 0, 30))
+    assert revalidate(client, auth, '/api/dashboard', first.headers['ETag']).status_code == 200
+
+    later = client.get(f'/api/dashboard?known={known}', headers=auth).get_json()
+    assert 'summary' not in later['not_modified']
+    assert later['summary']['expenses'] == 0.0
+    assert 'profile' in later['not_modified']
@@ -0,0 +1,62 @@
+"""
+Concorrência do XP diário no login: vários logins simultâneos do mesmo
+usuário concedem o XP diário exatamente uma vez.
+
+Roda contra um banco SQLite temporário (python -m pytest, a partir do
+diretório backend).
+"""
+import datetime
+import threading
+
+import pytest
+
+LOGINS = 16
+PASSWORD = 'senha-de-teste'
+
+
+@pytest.fixture
+def user_id(app):
+    from app.extensions import db
+    from app.models.user import User
+
+    with app.app_context():
+        user = User(
+            username='concorrencia',
+            email='concorrencia@example.com',
+            phone='(00) 00000-0000',
+            full_name='Teste de concorrência',
+            birth_date=datetime.date(2000, 1, 1)
+        )
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def test_concurrent_logins_grant_daily_xp_once(app, user_id):
+    from app.extensions import db
+    from app.models.user import DAILY_LOGIN_XP, User
+
+    barrier = threading.Barrier(LOGINS)
+    results = []
+    results_lock = threading.Lock()
+
+    def login():
+        client = app.test_client()
+        barrier.wait()
+        response = client.post('/api/login', json={'username': 'concorrencia', 'password': PASSWORD})
+        with results_lock:
+            results.append((response.status_code, (response.get_json() or {}).get('xp_gained', False)))
+
+    threads = [threading.Thread(target=login) for _ in range(LOGINS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        final_xp = db.session.get(User, user_id).xp
+
+    assert [status for status, _ in results] == [200] * LOGINS
+    assert sum(1 for _, gained in results if gained) == 1
+    assert final_xp == DAILY_LOGIN_XP
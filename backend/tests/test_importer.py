@@ -0,0 +1,90 @@
+"""
+Importação em lote: linhas inválidas são puladas, um arquivo malformado
+interrompe a leitura sem perder o que veio antes, e uma falha no banco no
+meio da importação informa quantas transações já foram gravadas.
+"""
+import io
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+# Campo maior que o limite do módulo csv (131072 caracteres): csv.Error
+BROKEN_LINE = '2024-01-03,"' + 'x' * 200000 + '",1\n'
+
+
+def csv_upload(*lines):
+    return io.BytesIO(('date,description,amount\n' + ''.join(lines)).encode())
+
+
+def stored(app, user_id):
+    from app.models.transaction import Transaction
+    from app.services import rollup_maintenance
+
+    with app.app_context():
+        count = Transaction.query.filter_by(user_id=user_id).count()
+        return count, rollup_maintenance.verify(user_id)
+
+
+def test_invalid_rows_are_reported_and_skipped(client, auth, app, user_id):
+    response = client.post('/api/transactions/import?format=csv', headers=auth, data=csv_upload(
+        '2024-01-01,Mercado,-10\n',
+        '2024-01-02,Salário,NaN\n',
+        'ontem,Farmácia,-5\n',
+        '2024-01-04,Padaria,"-3,50"\n'
+    ))
+
+    assert response.status_code == 201
+    result = response.get_json()
+    assert result['imported'] == 2
+    assert [error['line'] for error in result['errors']] == [3, 4]
+    assert result['file_error'] is None
+    assert stored(app, user_id) == (2, [])
+
+
+def test_malformed_file_keeps_rows_read_before_the_error(client, auth, app, user_id):
+    response = client.post('/api/transactions/import?format=csv', headers=auth, data=csv_upload(
+        '2024-01-01,Mercado,-10\n',
+        '2024-01-02,Farmácia,-5\n',
+        BROKEN_LINE,
+        '2024-01-04,Padaria,-3\n'
+    ))
+
+    assert response.status_code == 201
+    result = response.get_json()
+    assert result['imported'] == 2
+    assert result['file_error']['line'] == 4
+    assert stored(app, user_id) == (2, [])
+
+
+def test_malformed_file_without_valid_rows_is_rejected(client, auth):
+    response = client.post('/api/transactions/import?format=csv', headers=auth, data=csv_upload(BROKEN_LINE))
+
+    assert response.status_code == 400
+    assert response.get_json()['imported'] == 0
+
+
+def test_database_failure_reports_committed_batches(app, user_id, monkeypatch):
+    from app.services import importer, rollups
+
+    apply_delta = rollups.apply_delta
+    calls = []
+
+    def failing_apply_delta(*args):
+        calls.append(args)
+        if len(calls) == 3:
+            raise OperationalError('INSERT', {}, Exception('database is locked'))
+        return apply_delta(*args)
+
+    monkeypatch.setattr(rollups, 'apply_delta', failing_apply_delta)
+
+    text = io.StringIO('date,description,amount\n' + ''.join(
+        f'2024-01-{day:02d},Mercado,-{day}\n' for day in range(1, 6)
+    ))
+    with app.app_context():
+        with pytest.raises(importer.ImportAborted) as aborted:
+            importer.import_transactions(user_id, importer.iter_csv(text), batch_size=2)
+
+    # Um apply_delta por lote (mesmo mês e categoria): dois lotes de 2
+    # confirmados, o terceiro falhou e foi desfeito
+    assert aborted.value.result['imported'] == 4
+    assert stored(app, user_id) == (4, [])
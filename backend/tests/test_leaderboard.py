@@ -0,0 +1,47 @@
+"""
+Ranking em memória: a skip list montada em O(n) a partir das chaves
+ordenadas se comporta como a montada por inserções, e mudanças de XP
+feitas durante uma reconstrução não se perdem na troca do índice.
+"""
+import random
+
+
+def test_bulk_built_skip_list_matches_inserts():
+    from app.services.leaderboard import IndexableSkipList
+
+    rng = random.Random(7)
+    keys = sorted({(-rng.randrange(500), user_id) for user_id in range(2000)})
+    skiplist = IndexableSkipList.from_sorted(keys)
+
+    assert len(skiplist) == len(keys)
+    assert skiplist.slice(0, len(keys)) == keys
+    assert all(skiplist.count_less(key) == index for index, key in enumerate(keys))
+
+    # Inserções e remoções depois da carga mantêm as larguras corretas
+    for key in keys[::3]:
+        skiplist.remove(key)
+    extra = [(-1000, 1), (0, 5000), (-250, 4000)]
+    for key in extra:
+        skiplist.insert(key)
+    expected = sorted([key for index, key in enumerate(keys) if index % 3] + extra)
+    assert skiplist.slice(0, len(expected)) == expected
+    assert all(skiplist.count_less(key) == index for index, key in enumerate(expected))
+    assert skiplist.slice(10, 15) == expected[10:15]
+
+
+def test_changes_during_rebuild_are_replayed():
+    from app.services.leaderboard import MemoryLeaderboard
+
+    leaderboard = MemoryLeaderboard(rebuild_interval=60)
+    leaderboard.rebuild([(1, 10), (2, 20)])
+
+    def entries():
+        # Commits que chegam enquanto o banco ainda está sendo lido
+        yield 1, 10
+        leaderboard.update(3, 500)
+        leaderboard.remove(2)
+        yield 2, 20
+
+    leaderboard.rebuild(entries())
+    assert leaderboard.top(3) == [(3, 500, 1), (1, 10, 2)]
+    assert leaderboard.rank(2) is None
@@ -0,0 +1,38 @@
+"""
+Paginação por cursor (keyset) de /transactions: as páginas cobrem todas as
+transações uma vez só, na ordem (data, id) decrescente, inclusive com várias
+transações na mesma data.
+"""
+import datetime
+
+from sqlalchemy import insert
+
+
+def test_cursor_pages_cover_every_transaction_once(client, auth, app, user_id, category_ids):
+    from app.extensions import db
+    from app.models.transaction import Transaction
+
+    with app.app_context():
+        db.session.execute(insert(Transaction), [
+            {'description': f'T{index}', **Transaction.amount_values(100 + index), 'type': 'expense',
+             'date': datetime.date(2024, 1, index % 4 + 1), 'created_at': datetime.datetime(2024, 1, 5),
+             'user_id': user_id, 'category_id': category_ids['Alimentação']}
+            for index in range(23)
+        ])
+        db.session.commit()
+
+    seen = []
+    cursor = ''
+    while cursor is not None:
+        page = client.get(f'/api/transactions?limit=5&cursor={cursor}', headers=auth).get_json()
+        assert len(page['transactions']) <= 5
+        seen.extend((item['date'], item['id']) for item in page['transactions'])
+        cursor = page['next_cursor']
+
+    assert len(seen) == 23
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_invalid_cursor_is_rejected(client, auth):
+    response = client.get('/api/transactions?cursor=nao-e-um-cursor', headers=auth)
+    assert response.status_code == 400
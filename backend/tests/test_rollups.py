@@ -0,0 +1,83 @@
+"""
+Resumo mensal (monthly_summaries) mantido por deltas a cada escrita: depois
+de criar, editar e excluir transações ele deve bater com o recalculado em
+SQL por rollup_maintenance.verify(), inclusive para linhas antigas que o
+backfill de centavos ainda não converteu.
+"""
+import datetime
+
+import pytest
+from sqlalchemy import insert
+
+
+def verify(app, user_id):
+    from app.services import rollup_maintenance
+
+    with app.app_context():
+        return rollup_maintenance.verify(user_id)
+
+
+def create(client, auth, **fields):
+    response = client.post('/api/transactions', headers=auth, json={'description': 'Teste', **fields})
+    assert response.status_code == 201
+    return response.get_json()['transaction']['id']
+
+
+def test_rollups_follow_updates_and_deletes(client, auth, app, user_id, category_ids):
+    food, transport = category_ids['Alimentação'], category_ids['Transporte']
+    first = create(client, auth, amount=10.1, type='expense', category_id=food, date='2024-01-15')
+    second = create(client, auth, amount=20.2, type='expense', category_id=food, date='2024-01-20')
+    create(client, auth, amount=3000, type='income', category_id=category_ids['Salário'], date='2024-01-05')
+    assert verify(app, user_id) == []
+
+    # Valor, categoria e mês mudam: a linha sai de um grupo e entra em outro
+    response = client.put(f'/api/transactions/{first}', headers=auth, json={
+        'amount': 15.55, 'category_id': transport, 'date': '2024-02-01'
+    })
+    assert response.status_code == 200
+    assert verify(app, user_id) == []
+
+    assert client.delete(f'/api/transactions/{second}', headers=auth).status_code == 200
+    assert verify(app, user_id) == []
+
+    summary = client.get('/api/summary', headers=auth).get_json()
+    assert summary['expenses'] == 15.55
+    assert summary['income'] == 3000.0
+
+
+@pytest.mark.parametrize('legacy_amount', [0.285, 1.005, 10.675, 0.125])
+def test_rollups_stay_exact_for_rows_not_yet_backfilled(client, auth, app, user_id, category_ids, legacy_amount):
+    from app.extensions import db
+    from app.models.transaction import Transaction
+    from app.services import rollup_maintenance
+
+    # Linha gravada antes da migração para centavos: só a coluna float
+    with app.app_context():
+        transaction_id = db.session.execute(insert(Transaction.__table__).values(
+            description='Antiga', amount=legacy_amount, amount_cents=None, type='expense',
+            date=datetime.date(2023, 12, 10), created_at=datetime.datetime(2023, 12, 10),
+            user_id=user_id, category_id=category_ids['Alimentação']
+        )).inserted_primary_key[0]
+        db.session.commit()
+        rollup_maintenance.rebuild(user_id)
+        db.session.commit()
+    assert verify(app, user_id) == []
+
+    # Editar só a descrição não muda o valor nem o agregado
+    response = client.put(f'/api/transactions/{transaction_id}', headers=auth, json={'description': 'Editada'})
+    assert response.status_code == 200
+    assert verify(app, user_id) == []
+
+    # O delta da edição sai do valor antigo convertido como no banco
+    other_id = create(client, auth, amount=1, type='expense', category_id=category_ids['Alimentação'], date='2023-12-20')
+    with app.app_context():
+        db.session.execute(Transaction.__table__.update().where(Transaction.id == other_id)
+                           .values(amount=legacy_amount, amount_cents=None))
+        rollup_maintenance.rebuild(user_id)
+        db.session.commit()
+    response = client.put(f'/api/transactions/{other_id}', headers=auth, json={'amount': 2})
+    assert response.status_code == 200
+    assert verify(app, user_id) == []
+
+    assert client.delete(f'/api/transactions/{transaction_id}', headers=auth).status_code == 200
+    assert verify(app, user_id) == []
@@ -0,0 +1,11 @@
+"""
+Ponto de entrada para servidores WSGI em produção (ex.: gunicorn wsgi:app).
+
+Modo serve: a criação da aplicação não acessa o banco nem registra os
+comandos de linha de comando. Prepare o banco uma vez por implantação com
+'flask bootstrap' (FLASK_APP=run.py) e 'python -m migrations.runner upgrade'
+para bancos existentes.
+"""
+from app import create_app
+
+app = create_app(bootstrap=False, cli=False)
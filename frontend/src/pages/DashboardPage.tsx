@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { authService, transactionService } from '../services/api';
+import { dashboardService } from '../services/api';
 import '../assets/css/dashboard.css';
 import axios from 'axios';
 import { Transaction, FinancialSummary, Category } from '../types/transaction.types';
@@ -62,29 +62,15 @@ const DashboardPage: React.FC = () => {
 
         setLoading(true);
 
-        // Buscar perfil do usuário
-        console.log("Buscando perfil do usuário...");
-        const profileData = await authService.getProfile();
-        console.log("Perfil obtido:", profileData);
-        setUserProfile(profileData);
-        
-        // Buscar categorias
-        console.log("Buscando categorias...");
-        const categoriesData = await transactionService.getCategories();
-        console.log("Categorias obtidas:", categoriesData);
-        setCategories(categoriesData);
-        
-        // Buscar resumo financeiro (mensal)
-        console.log("Buscando resumo financeiro mensal...");
-        const summaryData = await transactionService.getSummary('month');
-        console.log("Resumo obtido:", summaryData);
-        setFinancialSummary(summaryData);
-        
-        // Buscar transações recentes (últimas 5)
-        console.log("Buscando transações recentes...");
-        const transactionsData = await transactionService.getTransactions({ limit: 5 });
-        console.log("Transações obtidas:", transactionsData);
-        setRecentTransactions(transactionsData);
+        // Buscar perfil, categorias, resumo mensal e as últimas 5 transações
+        // em uma única requisição
+        console.log("Buscando dados do dashboard...");
+        const dashboardData = await dashboardService.getDashboard();
+        console.log("Dashboard obtido:", dashboardData);
+        setUserProfile(dashboardData.profile);
+        setCategories(dashboardData.categories);
+        setFinancialSummary(dashboardData.summary);
+        setRecentTransactions(dashboardData.recent_transactions);
 
         setLoading(false);
       } catch (error) {
@@ -87,6 +87,13 @@ export const transactionService = {
     return response.data;
   },
   
+  // Paginação por cursor: envie cursor vazio para a primeira página e o
+  // next_cursor retornado para as seguintes (null indica a última página)
+  getTransactionsPage: async (filters = {}, cursor: string = '') => {
+    const response = await api.get('/transactions', { params: { ...filters, cursor } });
+    return response.data;
+  },
+  
   createTransaction: async (transactionData: any) => {
     const response = await api.post('/transactions', transactionData);
     return response.data;
@@ -102,12 +109,48 @@ export const transactionService = {
     return response.data;
   },
   
+  // Importação em lote de um arquivo CSV ou OFX
+  importTransactions: async (file: File) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await api.post('/transactions/import', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' }
+    });
+    return response.data;
+  },
+  
   getSummary: async (period: string = 'all') => {
     const response = await api.get('/summary', { params: { period } });
     return response.data;
   }
 };
 
+// Serviço do dashboard: perfil, categorias, resumo do mês e transações
+// recentes em uma única requisição. Seções que não mudaram desde a última
+// chamada voltam como null e são preenchidas com a cópia guardada aqui.
+const DASHBOARD_SECTIONS = ['profile', 'categories', 'summary', 'recent_transactions'];
+let dashboardCache: { etags: Record<string, string>; data: Record<string, any> } = { etags: {}, data: {} };
+
+export const dashboardService = {
+  getDashboard: async () => {
+    const known = Object.entries(dashboardCache.etags)
+      .map(([section, etag]) => `${section}:${etag}`)
+      .join(',');
+    const response = await api.get('/dashboard', { params: known ? { known } : {} });
+    const payload = response.data;
+    
+    const data: Record<string, any> = {};
+    DASHBOARD_SECTIONS.forEach((section) => {
+      data[section] = payload.not_modified.includes(section)
+        ? dashboardCache.data[section]
+        : payload[section];
+    });
+    
+    dashboardCache = { etags: payload.etags, data };
+    return data;
+  }
+};
+
 // Adicionar ao arquivo frontend/src/services/api.ts:
 
 // Serviços relacionados a XP, desafios e conquistas